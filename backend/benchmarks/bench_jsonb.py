@@ -0,0 +1,74 @@
+"""
+Benchmark JSONB decoding/encoding for large dynamic_table forms
+
+Compares the old per-handler path (stdlib json.loads/json.dumps on JSON text)
+with the protocol-layer codec registered in Database._init_connection.
+
+Usage:
+    python benchmarks/bench_jsonb.py [rows] [iterations]
+"""
+import json
+import sys
+import os
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import json_dumps, json_loads, orjson
+
+
+def build_form(rows: int) -> dict:
+    """Build a form definition with one large dynamic_table field"""
+    columns = [
+        {"id": f"col_{i}", "label": f"Column {i}", "type": t}
+        for i, t in enumerate(["text", "number", "number", "checkbox", "dropdown"])
+    ]
+    return {
+        "fields": [
+            {"id": "weight", "label": "Weight", "type": "number", "target": 75, "unit": "kg"},
+            {
+                "id": "workout_log",
+                "label": "Workout Log",
+                "type": "dynamic_table",
+                "columns": columns,
+                "rows": [
+                    {"col_0": f"Exercise {r}", "col_1": r * 2.5, "col_2": r % 12,
+                     "col_3": r % 2 == 0, "col_4": "Moderate"}
+                    for r in range(rows)
+                ],
+            },
+        ]
+    }
+
+
+def timeit(fn, iterations: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    form = build_form(rows)
+    text = json.dumps(form)
+
+    old_decode = timeit(lambda: json.loads(text), iterations)
+    new_decode = timeit(lambda: json_loads(text), iterations)
+    old_encode = timeit(lambda: json.dumps(form), iterations)
+    new_encode = timeit(lambda: json_dumps(form), iterations)
+
+    print(f"dynamic_table rows: {rows}, payload: {len(text) / 1024:.1f} KiB, "
+          f"codec backend: {'orjson' if orjson else 'json'}")
+    print(f"decode  stdlib json.loads: {old_decode:9.1f} us   codec: {new_decode:9.1f} us   "
+          f"({old_decode / new_decode:.1f}x)")
+    print(f"encode  stdlib json.dumps: {old_encode:9.1f} us   codec: {new_encode:9.1f} us   "
+          f"({old_encode / new_encode:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
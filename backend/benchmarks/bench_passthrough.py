@@ -0,0 +1,109 @@
+"""
+Benchmark JSON passthrough responses for large dynamic_table forms
+
+Compares the handler-side cost of the old list endpoint path (decode each
+row's JSONB, build dicts, validate against FormResponse and serialize, as
+FastAPI does for a response_model) with the passthrough path, where Postgres
+returns the finished body from json_agg(json_build_object(...)) and the
+handler only wraps it in a Response.
+
+Postgres-side json_agg cost is not included; compare it with
+EXPLAIN ANALYZE on forms.by_client_json against a real database.
+
+Usage:
+    python benchmarks/bench_passthrough.py [rows] [forms] [iterations]
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import models
+from bench_jsonb import build_form
+from utils.helpers import json_loads, raw_json_response
+
+
+def build_rows(rows: int, forms: int) -> list:
+    """Rows as asyncpg returns them for forms.by_client, with data still as JSON text"""
+    data = json.dumps(build_form(rows))
+    now = datetime.now()
+    return [
+        {
+            "id": uuid.uuid4(), "client_id": 1, "title": f"Form {i}", "data": data,
+            "status": "published", "is_template": False, "created_at": now, "updated_at": now,
+        }
+        for i in range(forms)
+    ]
+
+
+def build_body(rows: list) -> str:
+    """The JSON text forms.by_client_json would return for the same rows"""
+    return json.dumps([
+        {**row, "id": str(row["id"]), "data": json.loads(row["data"]),
+         "created_at": row["created_at"].isoformat(), "updated_at": row["updated_at"].isoformat()}
+        for row in rows
+    ])
+
+
+def old_path(rows: list, adapter: TypeAdapter) -> bytes:
+    """Decode JSONB, build dicts, validate and serialize"""
+    result = [
+        {
+            "id": str(row["id"]),
+            "client_id": row["client_id"],
+            "title": row["title"],
+            "data": json_loads(row["data"]),
+            "status": row["status"],
+            "is_template": row["is_template"],
+            "created_at": row["created_at"].isoformat(),
+            "updated_at": row["updated_at"].isoformat(),
+        }
+        for row in rows
+    ]
+    validated = adapter.validate_python(result)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def passthrough_path(body: str) -> bytes:
+    """Wrap the SQL-built body"""
+    return raw_json_response(body).body
+
+
+def bench(func, *args, iterations: int) -> float:
+    """Return mean milliseconds per call"""
+    func(*args)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(*args)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    forms = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    records = build_rows(rows, forms)
+    body = build_body(records)
+    adapter = TypeAdapter(List[models.FormResponse])
+
+    old_ms = bench(old_path, records, adapter, iterations=iterations)
+    new_ms = bench(passthrough_path, body, iterations=iterations)
+
+    print(f"{forms} forms x {rows} dynamic_table rows, body {len(body) / 1024:.0f} KiB, {iterations} iterations")
+    print(f"decode + validate + serialize: {old_ms:8.2f} ms")
+    print(f"passthrough:                   {new_ms:8.2f} ms  ({old_ms / new_ms:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
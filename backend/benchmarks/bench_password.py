@@ -0,0 +1,87 @@
+"""
+Benchmark bcrypt login throughput and its effect on other requests
+
+Simulates a burst of concurrent logins while a "fast endpoint" coroutine
+wakes up every millisecond, and reports login throughput alongside the
+fast endpoint's scheduling delay. Compares verifying on the event loop
+with verifying on the hashing pool from utils.password.
+
+Usage:
+    python benchmarks/bench_password.py [logins] [concurrency]
+"""
+import asyncio
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from config import settings
+from utils.password import hash_password, verify_password, verify_password_async
+
+PASSWORD = "correct horse battery staple"
+
+
+async def fast_endpoint(stop: asyncio.Event, delays: list):
+    """Stand-in for a cheap request: sleeps 1 ms and records how late it wakes"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def run(verify, hashed: str, logins: int, concurrency: int):
+    """Run `logins` verifications, at most `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    delays: list = []
+
+    async def login():
+        async with semaphore:
+            assert await verify(PASSWORD, hashed)
+
+    probe = asyncio.create_task(fast_endpoint(stop, delays))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    return elapsed, delays
+
+
+async def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    bcrypt_hash = hash_password(PASSWORD)
+    legacy_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+
+    async def inline(password, hashed):
+        return verify_password(password, hashed)
+
+    cases = [
+        ("legacy sha256 (inline)", inline, legacy_hash),
+        ("bcrypt on event loop", inline, bcrypt_hash),
+        ("bcrypt on hash pool", verify_password_async, bcrypt_hash),
+    ]
+
+    print(f"{logins} logins, {concurrency} concurrent, bcrypt rounds={settings.BCRYPT_ROUNDS}, "
+          f"hash pool={settings.PASSWORD_HASH_CONCURRENCY} threads")
+    print(f"{'case':<26} {'logins/s':>9} {'probe p50 ms':>13} {'probe p99 ms':>13} {'probe max ms':>13}")
+    for name, verify, hashed in cases:
+        elapsed, delays = await run(verify, hashed, logins, concurrency)
+        delays.sort()
+        p99 = delays[int(len(delays) * 0.99)] if delays else 0.0
+        print(f"{name:<26} {logins / elapsed:>9.1f} {statistics.median(delays) if delays else 0:>13.2f} "
+              f"{p99:>13.2f} {max(delays, default=0):>13.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
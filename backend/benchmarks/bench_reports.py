@@ -0,0 +1,79 @@
+"""
+Benchmark batch report generation against one report per submission
+
+Compares calling generate_report for every submission of a report job with
+generate_reports over the whole chunk, whose achievement and variance
+arithmetic runs on numpy arrays. Before timing, checks that both produce
+identical reports, including values that sit exactly on a rounding boundary
+and zero targets.
+
+Usage:
+    python benchmarks/bench_reports.py [submissions] [fields] [iterations]
+"""
+import os
+import random
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from utils.report_generator import generate_report, generate_reports
+
+
+def build_items(submissions: int, fields: int, seed: int = 7) -> list:
+    """(form_data, submission_data) pairs with numeric fields that have targets"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(submissions):
+        form_fields = []
+        data = {}
+        for index in range(fields):
+            target = rng.choice([0, 1, 3, 7, 8.5, 40, rng.uniform(1, 200)])
+            # Half-cent actuals land variances exactly on a rounding boundary
+            actual = rng.choice([0, target, round(rng.uniform(0, 250), 3), target + 0.005])
+            form_fields.append({
+                "id": f"field_{index}", "type": "number", "label": f"Metric {index}",
+                "unit": "kg", "target": target
+            })
+            data[f"field_{index}"] = str(actual)
+        items.append(({"fields": form_fields}, data))
+    return items
+
+
+def strip_timestamps(reports: list) -> list:
+    return [{key: value for key, value in report.items() if key != "generated_at"} for report in reports]
+
+
+def timeit(fn, iterations: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fields = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    items = build_items(submissions, fields)
+    per_item = strip_timestamps([generate_report(form, data) for form, data in items])
+    batched = strip_timestamps(generate_reports(items))
+    assert per_item == batched, "generate_reports differs from generate_report"
+    assert repr(per_item) == repr(batched), "generate_reports differs from generate_report (signed zeros)"
+
+    single = timeit(lambda: [generate_report(form, data) for form, data in items], iterations)
+    batch = timeit(lambda: generate_reports(items), iterations)
+
+    print(f"submissions: {submissions}, metrics per report: {fields}")
+    print(f"generate_report each: {single:10.1f} us   generate_reports: {batch:10.1f} us   "
+          f"({single / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
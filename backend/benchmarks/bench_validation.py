@@ -0,0 +1,70 @@
+"""
+Benchmark submission validation for large dynamic_table forms
+
+Compares compiling the validator on every submit with reusing the compiled
+validator cached per form version, as submit_form does. Submissions are
+shaped like the ones fill-form.html posts: one flat key per table cell
+(`<field>_row_<r>_col_<c>`) plus `<field>_row_count`.
+
+Usage:
+    python benchmarks/bench_validation.py [rows] [iterations]
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET_KEY", "bench")
+
+from bench_jsonb import build_form
+from utils.form_validation import compile_validator
+
+
+def build_submission(form: dict) -> dict:
+    """Fill every field of the form the way the client form page does"""
+    data = {}
+    for field in form["fields"]:
+        if field["type"] == "dynamic_table":
+            columns = field["columns"]
+            for row_index, row in enumerate(field["rows"]):
+                for col_index in range(len(columns)):
+                    value = row[f"col_{col_index}"]
+                    data[f"{field['id']}_row_{row_index}_col_{col_index}"] = (
+                        value if isinstance(value, bool) else str(value)
+                    )
+            data[f"{field['id']}_row_count"] = len(field["rows"])
+        else:
+            data[field["id"]] = "72.5"
+    return data
+
+
+def timeit(fn, iterations: int) -> float:
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    fields = build_form(rows)["fields"]
+    submission = build_submission({"fields": fields})
+    validator = compile_validator(fields)
+    assert validator(submission) == [], validator(submission)
+
+    per_submit = timeit(lambda: compile_validator(fields)(submission), iterations)
+    cached = timeit(lambda: validator(submission), iterations)
+
+    print(f"dynamic_table rows: {rows}, submission keys: {len(submission)}")
+    print(f"compile per submit: {per_submit:9.1f} us   cached validator: {cached:9.1f} us   "
+          f"({per_submit / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
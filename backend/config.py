@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import List, Tuple
 import os
 from pathlib import Path
 
@@ -12,11 +12,82 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str
+    DATABASE_READ_URLS: str = ""  # Optional comma-separated read replica URLs
+    REPLICA_EJECT_SECONDS: int = 30  # How long a failing replica is skipped
+    
+    # Database Pool Configuration (per worker process)
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_CONNECTION_BUDGET: int = 80  # Connections per database across all workers, LISTEN included (0 = no cap)
+    DB_COMMAND_TIMEOUT: float = 60
+    DB_MAX_QUERIES: int = 50000
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300
+    
+    # Server Configuration
+    PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # Uvicorn worker processes for run.py --production (0 = one per CPU)
+    
+    # Slow Query Diagnostics
+    SLOW_QUERY_MS: int = 500  # Statements slower than this are logged (0 disables)
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.2  # Fraction of slow statements to EXPLAIN
+    SLOW_QUERY_EXPLAIN_TIMEOUT_FACTOR: float = 4  # EXPLAIN timeout, as a multiple of SLOW_QUERY_MS
+    SLOW_QUERY_LOG_SIZE: int = 100  # Entries kept for /api/admin/diagnostics/slow-queries
+    
+    # Metrics
+    METRICS_SCRAPE_TOKEN: str = ""  # Bearer token for Prometheus on /api/metrics (empty = admin login only)
+    
+    # List Pagination
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    
+    # Published Forms Cache (per worker process)
+    PUBLISHED_FORMS_CACHE_SIZE: int = 1000  # Cached first pages across clients
+    PUBLISHED_FORMS_CACHE_TTL_SECONDS: float = 300  # Safety net behind invalidation
+    
+    # Submission Validators (per worker process)
+    FORM_VALIDATOR_CACHE_SIZE: int = 2000  # Compiled validators, one per form
+    FORM_VALIDATOR_CACHE_TTL_SECONDS: float = 3600  # Entries are also checked against updated_at
+    
+    # Form Schema Garbage Collection
+    FORM_SCHEMA_GC_INTERVAL_SECONDS: float = 3600  # How often unreferenced definitions are deleted
+    FORM_SCHEMA_GC_BATCH_SIZE: int = 1000  # Definitions deleted per statement
+    
+    # Batch Report Jobs
+    REPORT_JOB_CHUNK_SIZE: int = 200  # Submissions per chunk (one primary connection at a time)
+    REPORT_JOB_STALE_SECONDS: float = 300  # A running job with no progress for this long is failed
+    
+    # Request Deadlines (seconds of database time per request)
+    READ_DEADLINE_SECONDS: float = 2.0
+    WRITE_DEADLINE_SECONDS: float = 5.0
+    REPORT_DEADLINE_SECONDS: float = 10.0
     
     # JWT Configuration
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    TOKEN_CACHE_SIZE: int = 10000  # Verified tokens kept in memory per worker
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5  # How often workers pick up new revocations
+    TOKEN_REVOCATION_OVERLAP_SECONDS: float = 60  # Re-read window covering revocations committed late
+    TOKEN_REVOCATION_RELOAD_SECONDS: float = 600  # Full re-read of live revocations (0 disables)
+    
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 2  # bcrypt threads per worker process
+    
+    # Login Throttling (per worker process)
+    LOGIN_IP_RATE_PER_MINUTE: float = 30
+    LOGIN_IP_BURST: int = 10
+    LOGIN_EMAIL_RATE_PER_MINUTE: float = 10
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_LOCKOUT_FAILURES: int = 5  # Failed logins within the window that lock an email
+    LOGIN_LOCKOUT_WINDOW_SECONDS: float = 300
+    LOGIN_LOCKOUT_SECONDS: float = 900
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000  # Tracked IPs/emails before LRU eviction
+    # Proxies in front of the app that append to X-Forwarded-For (Railway: 1).
+    # The per-IP bucket keys on the entry the outermost of them appended,
+    # counted from the right; entries to its left are client-supplied.
+    # 0 = no proxy, key on the socket peer
+    TRUSTED_PROXY_HOPS: int = 0
     
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:8000"
@@ -35,6 +106,33 @@ class Settings(BaseSettings):
         """Parse ALLOWED_ORIGINS into a list"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    def get_read_urls(self) -> List[str]:
+        """Parse DATABASE_READ_URLS into a list"""
+        return [url.strip() for url in self.DATABASE_READ_URLS.split(",") if url.strip()]
+    
+    def get_worker_count(self) -> int:
+        """Resolve WEB_CONCURRENCY, where 0 means one worker per CPU"""
+        if self.WEB_CONCURRENCY > 0:
+            return self.WEB_CONCURRENCY
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0)) or 1
+        return os.cpu_count() or 1
+    
+    def get_pool_size(self, reserved: int = 0) -> Tuple[int, int]:
+        """
+        Per-worker (min_size, max_size) for each connection pool
+        
+        The connection budget is split evenly across workers so scaling
+        out never opens more than DB_CONNECTION_BUDGET connections per
+        database server. `reserved` connections each worker opens outside
+        the pool (LISTEN) come out of its share.
+        """
+        max_size = self.DB_POOL_MAX_SIZE
+        if self.DB_CONNECTION_BUDGET > 0:
+            share = self.DB_CONNECTION_BUDGET // self.get_worker_count() - reserved
+            max_size = min(max_size, max(1, share))
+        return min(self.DB_POOL_MIN_SIZE, max_size), max_size
+    
     def is_production(self) -> bool:
         """Check if running in production"""
         return self.ENVIRONMENT.lower() == "production"
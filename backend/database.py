@@ -1,177 +1,566 @@
+import asyncio
 import asyncpg
-from typing import Optional, Any, List
+from contextlib import asynccontextmanager, contextmanager
+from itertools import count
+from typing import Optional, Any, Callable, List, Dict, Tuple, AsyncIterator, Iterator
 import logging
+import random
+import time
 import config as config_module
+from diagnostics import SlowQueryLog, is_read_only, redact_params
+from metrics import registry, query_label
+from queries import STATEMENTS
+from utils import deadline
+from utils.helpers import json_dumps, json_loads
 
 settings = config_module.settings
 logger = logging.getLogger(__name__)
 
+PRIMARY = "primary"
+
+# Primary connections each worker holds outside its pool: the forms_changed
+# listener (see Database.listen). They come out of the worker's share of
+# DB_CONNECTION_BUDGET.
+LISTEN_CONNECTIONS = 1
+
+# Errors that mean a replica is unreachable, as opposed to a bad or slow query.
+# OSError covers refused/reset connections and DNS failures; since Python 3.11
+# asyncio.TimeoutError is the builtin TimeoutError, an OSError subclass, so
+# timeouts are excluded explicitly wherever these are caught.
+REPLICA_FAILURE_ERRORS = (
+    OSError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+)
+
+POOL_ACQUIRE_SECONDS = registry.histogram(
+    "db_pool_acquire_seconds", "Time spent waiting to acquire a pooled connection", ["pool"]
+)
+QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "Query execution time by statement name or SQL fingerprint", ["pool", "query"]
+)
+QUERY_ERRORS = registry.counter(
+    "db_query_errors_total", "Failed queries by statement and error type", ["pool", "query", "error"]
+)
+POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections", "Pool connections by state (in_use, idle, max)", ["pool", "state"]
+)
+
 class DatabaseError(Exception):
     """Custom exception for database errors"""
     pass
 
+class QueryTimeoutError(DatabaseError):
+    """Raised when a query or pool acquire runs past the request deadline"""
+    pass
+
+def _time_budget() -> Optional[float]:
+    """
+    Timeout for the next database call, from the current request deadline
+
+    Returns:
+        Remaining seconds, or None to fall back to command_timeout
+
+    Raises:
+        QueryTimeoutError: If the deadline has already passed
+    """
+    left = deadline.remaining()
+    if left is None:
+        return None
+    if left <= 0:
+        raise QueryTimeoutError("Request deadline exceeded")
+    return left
+
+@contextmanager
+def _database_errors(method: str, query: str, passthrough: tuple = ()) -> Iterator[None]:
+    """Log driver errors and re-raise them as DatabaseError, except `passthrough` types"""
+    try:
+        yield
+    except DatabaseError:
+        raise
+    except asyncio.TimeoutError as e:
+        # asyncpg has already asked the server to cancel the statement
+        logger.warning(f"Database {method} timed out\nQuery: {query}")
+        raise QueryTimeoutError("Request deadline exceeded") from e
+    except passthrough:
+        raise
+    except asyncpg.PostgresError as e:
+        logger.error(f"Database {method} error: {e}\nQuery: {query}")
+        raise DatabaseError(f"Query execution failed: {str(e)}") from e
+    except Exception as e:
+        logger.error(f"Unexpected error during {method}: {e}")
+        raise DatabaseError(f"Unexpected database error: {str(e)}") from e
+
+class ReadReplica:
+    """A read-only replica pool that is skipped for a while after failing"""
+
+    def __init__(self, label: str, pool: asyncpg.Pool):
+        self.label = label
+        self.pool = pool
+        self.ejected_until = 0.0
+
+    def is_available(self) -> bool:
+        """Check whether the replica is currently taking reads"""
+        return time.monotonic() >= self.ejected_until
+
+    def eject(self, seconds: float):
+        """Stop routing reads to this replica for the given number of seconds"""
+        self.ejected_until = time.monotonic() + seconds
+
+    def restore(self):
+        """Put the replica back into rotation"""
+        self.ejected_until = 0.0
+
 class Database:
     """Database connection manager using asyncpg with error handling"""
-    
+
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
-    
+        self.replicas: List[ReadReplica] = []
+        self._replica_cursor = count()
+        registry.add_collector(self._collect_pool_metrics)
+        self.slow_queries = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+        self._explain_task: Optional[asyncio.Task] = None
+
+    async def _create_pool(self, dsn: str, label: str) -> asyncpg.Pool:
+        """Create a connection pool whose connections are initialised for `label`"""
+        min_size, max_size = settings.get_pool_size(LISTEN_CONNECTIONS if label == PRIMARY else 0)
+        logger.info(f"Creating '{label}' pool with min_size={min_size}, max_size={max_size}")
+        return await asyncpg.create_pool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            command_timeout=settings.DB_COMMAND_TIMEOUT,
+            max_queries=settings.DB_MAX_QUERIES,
+            max_inactive_connection_lifetime=settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+            # Room for the whole registry plus ad-hoc SQL, so no registered
+            # statement is evicted and re-parsed
+            statement_cache_size=len(STATEMENTS) + 100,
+            init=self._init_connection
+        )
+
     async def connect(self):
         """Create database connection pool with retry logic"""
         max_retries = 3
         retry_delay = 2
-        
+
         for attempt in range(max_retries):
             try:
-                self.pool = await asyncpg.create_pool(
-                    settings.DATABASE_URL,
-                    min_size=5,
-                    max_size=20,
-                    command_timeout=60,
-                    max_queries=50000,
-                    max_inactive_connection_lifetime=300
-                )
+                self.pool = await self._create_pool(settings.DATABASE_URL, PRIMARY)
                 logger.info("✅ Database connection pool created successfully")
-                
+
                 # Test connection
                 async with self.pool.acquire() as conn:
                     await conn.fetchval("SELECT 1")
+                    await self._check_statements(conn)
                 logger.info("✅ Database connection verified")
-                return
-                
+                break
+
             except Exception as e:
                 logger.error(f"❌ Error connecting to database (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt < max_retries - 1:
                     logger.info(f"Retrying in {retry_delay} seconds...")
-                    import asyncio
                     await asyncio.sleep(retry_delay)
                 else:
                     raise DatabaseError(f"Failed to connect to database after {max_retries} attempts") from e
-    
+
+        await self._connect_replicas()
+
+    async def _connect_replicas(self):
+        """Create pools for the configured read replicas; failures are not fatal"""
+        for index, url in enumerate(settings.get_read_urls()):
+            label = f"replica-{index}"
+            try:
+                pool = await self._create_pool(url, label)
+                self.replicas.append(ReadReplica(label, pool))
+                logger.info(f"✅ Read replica pool '{label}' created")
+            except Exception as e:
+                logger.error(f"❌ Could not connect to read replica '{label}', reads stay on primary: {e}")
+
     async def disconnect(self):
-        """Close database connection pool"""
+        """Close database connection pools"""
+        for replica in self.replicas:
+            try:
+                await replica.pool.close()
+            except Exception as e:
+                logger.error(f"❌ Error closing replica pool '{replica.label}': {e}")
+        self.replicas = []
+
         if self.pool:
             try:
                 await self.pool.close()
                 logger.info("✅ Database connection pool closed")
             except Exception as e:
                 logger.error(f"❌ Error closing database pool: {e}")
-    
+
+    async def _init_connection(self, connection: asyncpg.Connection):
+        """
+        Register type codecs on a newly opened connection
+
+        Runs once per physical connection, including the ones the pool opens
+        to replace connections recycled after `max_queries`.
+        """
+        # Decode/encode JSON at the protocol layer: records hold dicts and
+        # parameters accept dicts directly
+        for type_name in ("json", "jsonb"):
+            await connection.set_type_codec(
+                type_name,
+                encoder=json_dumps,
+                decoder=json_loads,
+                schema="pg_catalog"
+            )
+
+    async def _check_statements(self, connection):
+        """
+        Prepare every registered statement once, logging any that fail
+
+        Statements run through asyncpg's per-connection statement cache,
+        which prepares each one on first use and reuses it afterwards.
+        (PreparedStatement objects cannot be kept across acquires: asyncpg
+        invalidates them when the connection goes back to the pool.) This
+        check surfaces a broken statement at startup instead of on the
+        first request that runs it.
+        """
+        for name, query in STATEMENTS.items():
+            try:
+                await connection.prepare(query)
+            except asyncpg.PostgresError as e:
+                logger.error(f"Could not prepare statement '{name}': {e}")
+
+    def _resolve(self, query: str) -> str:
+        """Resolve a registered statement name, or pass raw SQL through"""
+        return STATEMENTS.get(query, query)
+
+    @asynccontextmanager
+    async def _acquire(self, pool: asyncpg.Pool, label: str, passthrough: tuple = ()) -> AsyncIterator[Any]:
+        """
+        Acquire a connection from `pool` within the request deadline, recording the wait
+
+        Only the wait is mapped through `_database_errors`, so a deadline hit
+        while queued for a connection surfaces as QueryTimeoutError like a
+        statement timeout. `passthrough` errors are re-raised unchanged.
+        """
+        started = time.perf_counter()
+        with _database_errors("acquire", f"<{label} pool>", passthrough):
+            connection = await pool.acquire(timeout=_time_budget())
+        POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - started, label)
+        try:
+            yield connection
+        finally:
+            await pool.release(connection)
+
+    async def _call(self, connection, label: str, method: str, query: str, args: tuple) -> Any:
+        """Run a registered statement or SQL string on an acquired connection"""
+        sql = self._resolve(query)
+        name = query_label(query, query in STATEMENTS)
+        started = time.perf_counter()
+
+        try:
+            # The remaining request budget becomes the statement timeout;
+            # asyncpg cancels the statement server-side when it expires
+            timeout = _time_budget()
+            result = await getattr(connection, method)(sql, *args, timeout=timeout)
+        except Exception as e:
+            QUERY_ERRORS.inc(label, name, type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            QUERY_SECONDS.observe(elapsed, label, name)
+
+        # Failed and timed-out statements are counted in QUERY_ERRORS only;
+        # re-running them under EXPLAIN would just fail or time out again
+        if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            self._record_slow_query(label, name, sql, args, elapsed * 1000)
+        return result
+
+    def _record_slow_query(self, label: str, name: str, sql: str, args: tuple, duration_ms: float):
+        """Log a slow statement and sometimes capture its plan in the background"""
+        entry = self.slow_queries.record(label, name, sql, args, duration_ms)
+        logger.warning(
+            f"Slow query {name} on {label}: {duration_ms:.1f}ms "
+            f"(params: {', '.join(redact_params(args)) or 'none'})"
+        )
+
+        # At most one EXPLAIN in flight, so a slow period doesn't pile more
+        # work onto the database
+        if self._explain_task is not None and not self._explain_task.done():
+            return
+        if random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+            return
+        self._explain_task = asyncio.create_task(self._explain(entry, label, sql, args, duration_ms))
+
+    async def _explain(self, entry: Dict[str, Any], label: str, sql: str, args: tuple, duration_ms: float):
+        """
+        Capture a plan for a slow statement on a side connection
+
+        Plain SELECTs run under EXPLAIN (ANALYZE, BUFFERS) when they finished
+        within the EXPLAIN timeout; everything else only gets a plain EXPLAIN,
+        so writes are never executed twice. The timeout is
+        SLOW_QUERY_EXPLAIN_TIMEOUT_FACTOR times SLOW_QUERY_MS, and everything
+        runs inside a transaction that is rolled back.
+        """
+        pool = self.pool if label == PRIMARY else next(
+            (replica.pool for replica in self.replicas if replica.label == label), None
+        )
+        if pool is None:
+            return
+
+        timeout = settings.SLOW_QUERY_MS * settings.SLOW_QUERY_EXPLAIN_TIMEOUT_FACTOR / 1000
+        options = "(ANALYZE, BUFFERS)" if is_read_only(sql) and duration_ms / 1000 < timeout else ""
+        try:
+            async with pool.acquire(timeout=1) as connection:
+                transaction = connection.transaction(readonly=bool(options))
+                await transaction.start()
+                try:
+                    rows = await connection.fetch(f"EXPLAIN {options} {sql}", *args, timeout=timeout)
+                finally:
+                    await transaction.rollback()
+            entry["plan"] = "\n".join(row[0] for row in rows)
+        except Exception as e:
+            logger.warning(f"Could not EXPLAIN slow query {entry['query']}: {e}")
+
+    def _collect_pool_metrics(self):
+        """Refresh pool connection gauges; called by the metrics registry"""
+        pools = [(PRIMARY, self.pool)] + [(replica.label, replica.pool) for replica in self.replicas]
+        for label, pool in pools:
+            if pool is None:
+                continue
+            size = pool.get_size()
+            idle = pool.get_idle_size()
+            POOL_CONNECTIONS.set(size - idle, label, "in_use")
+            POOL_CONNECTIONS.set(idle, label, "idle")
+            POOL_CONNECTIONS.set(pool.get_max_size(), label, "max")
+
+    def _next_replica(self) -> Optional[ReadReplica]:
+        """Pick the next available replica in round-robin order"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._replica_cursor) % len(self.replicas)]
+            if replica.is_available():
+                return replica
+        return None
+
+    async def _read_from_replica(self, method: str, query: str, args: tuple) -> Tuple[bool, Any]:
+        """
+        Try to run a read-only query on a replica
+
+        Returns:
+            Tuple of (handled, result); handled is False when no replica could
+            serve the query and it should run on the primary instead
+        """
+        replica = self._next_replica()
+        if replica is None:
+            return False, None
+
+        try:
+            # Connection failures stay raw so the replica is ejected below
+            async with self._acquire(replica.pool, replica.label, REPLICA_FAILURE_ERRORS) as connection:
+                return True, await self._call(connection, replica.label, method, query, args)
+        except (asyncio.TimeoutError, QueryTimeoutError):
+            # A slow query or an exhausted deadline says nothing about the
+            # replica's health; retrying on the primary would only double
+            # the load
+            raise
+        except REPLICA_FAILURE_ERRORS as e:
+            logger.warning(
+                f"Read replica '{replica.label}' failed, ejecting for "
+                f"{settings.REPLICA_EJECT_SECONDS}s: {e}"
+            )
+            replica.eject(settings.REPLICA_EJECT_SECONDS)
+            return False, None
+
+    async def _run(self, method: str, query: str, args: tuple, read_only: bool = False) -> Any:
+        """
+        Acquire a pooled connection and run a query on it
+
+        Args:
+            method: asyncpg method name (execute, fetch, fetchrow, fetchval)
+            query: Registered statement name or SQL query string
+            args: Query parameters
+            read_only: Allow the query to be served by a read replica
+
+        Raises:
+            DatabaseError: If query execution fails
+        """
+        if not self.pool:
+            raise DatabaseError("Database pool not initialized")
+
+        with _database_errors(method, query):
+            if read_only and self.replicas:
+                handled, result = await self._read_from_replica(method, query, args)
+                if handled:
+                    return result
+
+            async with self._acquire(self.pool, PRIMARY) as connection:
+                return await self._call(connection, PRIMARY, method, query, args)
+
     async def execute(self, query: str, *args) -> str:
         """
         Execute a query that doesn't return results
-        
+
         Args:
-            query: SQL query string
+            query: Registered statement name or SQL query string
             *args: Query parameters
-            
+
         Returns:
             Query execution status
-            
+
         Raises:
             DatabaseError: If query execution fails
         """
-        if not self.pool:
-            raise DatabaseError("Database pool not initialized")
-            
-        try:
-            async with self.pool.acquire() as connection:
-                return await connection.execute(query, *args)
-        except asyncpg.PostgresError as e:
-            logger.error(f"Database execute error: {e}\nQuery: {query}")
-            raise DatabaseError(f"Query execution failed: {str(e)}") from e
-        except Exception as e:
-            logger.error(f"Unexpected error during execute: {e}")
-            raise DatabaseError(f"Unexpected database error: {str(e)}") from e
-    
-    async def fetch(self, query: str, *args) -> List[asyncpg.Record]:
+        return await self._run("execute", query, args)
+
+    async def fetch(self, query: str, *args, read_only: bool = False) -> List[asyncpg.Record]:
         """
         Fetch multiple rows
-        
+
         Args:
-            query: SQL query string
+            query: Registered statement name or SQL query string
             *args: Query parameters
-            
+            read_only: Allow the query to be served by a read replica
+
         Returns:
             List of database records
-            
+
         Raises:
             DatabaseError: If query execution fails
         """
-        if not self.pool:
-            raise DatabaseError("Database pool not initialized")
-            
-        try:
-            async with self.pool.acquire() as connection:
-                return await connection.fetch(query, *args)
-        except asyncpg.PostgresError as e:
-            logger.error(f"Database fetch error: {e}\nQuery: {query}")
-            raise DatabaseError(f"Query execution failed: {str(e)}") from e
-        except Exception as e:
-            logger.error(f"Unexpected error during fetch: {e}")
-            raise DatabaseError(f"Unexpected database error: {str(e)}") from e
-    
-    async def fetchrow(self, query: str, *args) -> Optional[asyncpg.Record]:
+        return await self._run("fetch", query, args, read_only)
+
+    async def fetchrow(self, query: str, *args, read_only: bool = False) -> Optional[asyncpg.Record]:
         """
         Fetch a single row
-        
+
         Args:
-            query: SQL query string
+            query: Registered statement name or SQL query string
             *args: Query parameters
-            
+            read_only: Allow the query to be served by a read replica
+
         Returns:
             Single database record or None
-            
+
         Raises:
             DatabaseError: If query execution fails
         """
-        if not self.pool:
-            raise DatabaseError("Database pool not initialized")
-            
-        try:
-            async with self.pool.acquire() as connection:
-                return await connection.fetchrow(query, *args)
-        except asyncpg.PostgresError as e:
-            logger.error(f"Database fetchrow error: {e}\nQuery: {query}")
-            raise DatabaseError(f"Query execution failed: {str(e)}") from e
-        except Exception as e:
-            logger.error(f"Unexpected error during fetchrow: {e}")
-            raise DatabaseError(f"Unexpected database error: {str(e)}") from e
-    
-    async def fetchval(self, query: str, *args) -> Any:
+        return await self._run("fetchrow", query, args, read_only)
+
+    async def fetchval(self, query: str, *args, read_only: bool = False) -> Any:
         """
         Fetch a single value
-        
+
         Args:
-            query: SQL query string
+            query: Registered statement name or SQL query string
             *args: Query parameters
-            
+            read_only: Allow the query to be served by a read replica
+
         Returns:
             Single value from query result
-            
+
         Raises:
             DatabaseError: If query execution fails
         """
+        return await self._run("fetchval", query, args, read_only)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["PinnedConnection"]:
+        """
+        Hold one primary connection for a whole unit of work
+
+        Usage:
+            async with db.connection() as conn:
+                row = await conn.fetchrow("clients.get", client_id)
+
+        Raises:
+            DatabaseError: If the pool is not initialized
+        """
         if not self.pool:
             raise DatabaseError("Database pool not initialized")
-            
-        try:
-            async with self.pool.acquire() as connection:
-                return await connection.fetchval(query, *args)
-        except asyncpg.PostgresError as e:
-            logger.error(f"Database fetchval error: {e}\nQuery: {query}")
-            raise DatabaseError(f"Query execution failed: {str(e)}") from e
-        except Exception as e:
-            logger.error(f"Unexpected error during fetchval: {e}")
-            raise DatabaseError(f"Unexpected database error: {str(e)}") from e
-    
+
+        async with self._acquire(self.pool, PRIMARY) as connection:
+            yield PinnedConnection(self, connection, PRIMARY)
+
+    @asynccontextmanager
+    async def transaction(self, isolation: Optional[str] = None) -> AsyncIterator["PinnedConnection"]:
+        """
+        Hold one primary connection inside a transaction
+
+        The transaction commits when the block exits normally and rolls back
+        if it raises (including HTTPException).
+
+        Usage:
+            async with db.transaction() as tx:
+                await tx.fetchrow("forms.exists", form_id)
+                await tx.execute("forms.delete", form_id)
+
+        Args:
+            isolation: Optional isolation level ('read_committed',
+                'repeatable_read' or 'serializable')
+        """
+        async with self.connection() as conn:
+            async with conn.raw.transaction(isolation=isolation):
+                yield conn
+
+    async def listen(self, channel: str, callback: Callable[[str], None],
+                     on_reconnect: Optional[Callable[[], None]] = None):
+        """
+        Deliver NOTIFY payloads on `channel` to `callback` until cancelled
+
+        Uses a dedicated primary connection outside the pool, counted in
+        LISTEN_CONNECTIONS. If it drops,
+        the listener reconnects and calls `on_reconnect`, since notifications
+        sent in between were missed.
+
+        Args:
+            channel: Postgres notification channel
+            callback: Called with each notification payload
+            on_reconnect: Called after the listener is re-established
+        """
+        retry_delay = 2
+        first_attempt = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(settings.DATABASE_URL)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(channel, lambda _conn, _pid, _channel, payload: callback(payload))
+                if not first_attempt and on_reconnect is not None:
+                    on_reconnect()
+                first_attempt = False
+                logger.info(f"✅ Listening for '{channel}' notifications")
+                await lost.wait()
+                logger.warning(f"Listener connection for '{channel}' lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Could not listen for '{channel}' notifications: {e}")
+                first_attempt = False
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(retry_delay)
+
     async def health_check(self) -> bool:
         """
         Check database connectivity
-        
+
+        Ejected replicas that answer again are put back into rotation.
+
         Returns:
-            True if database is accessible, False otherwise
+            True if the primary database is accessible, False otherwise
         """
+        for replica in self.replicas:
+            if replica.is_available():
+                continue
+            try:
+                async with replica.pool.acquire() as conn:
+                    await conn.fetchval("SELECT 1")
+                replica.restore()
+                logger.info(f"✅ Read replica '{replica.label}' restored")
+            except Exception as e:
+                logger.warning(f"Read replica '{replica.label}' still unhealthy: {e}")
+
         try:
             if not self.pool:
                 return False
@@ -182,5 +571,38 @@ class Database:
             logger.error(f"Health check failed: {e}")
             return False
 
+class PinnedConnection:
+    """A pooled connection held by `Database.connection()` / `Database.transaction()`"""
+
+    def __init__(self, database: Database, connection, label: str):
+        self._db = database
+        self._label = label
+        self.raw = connection
+
+    async def _run(self, method: str, query: str, args: tuple) -> Any:
+        """Run a registered statement or SQL string on the pinned connection"""
+        with _database_errors(method, query):
+            return await self._db._call(self.raw, self._label, method, query, args)
+
+    async def execute(self, query: str, *args) -> str:
+        """Execute a query that doesn't return results"""
+        return await self._run("execute", query, args)
+
+    async def fetch(self, query: str, *args) -> List[asyncpg.Record]:
+        """Fetch multiple rows"""
+        return await self._run("fetch", query, args)
+
+    async def executemany(self, query: str, args: List[tuple]):
+        """Execute a statement once per argument tuple, pipelined in one round trip"""
+        return await self._run("executemany", query, (args,))
+
+    async def fetchrow(self, query: str, *args) -> Optional[asyncpg.Record]:
+        """Fetch a single row"""
+        return await self._run("fetchrow", query, args)
+
+    async def fetchval(self, query: str, *args) -> Any:
+        """Fetch a single value"""
+        return await self._run("fetchval", query, args)
+
 # Global database instance
 db = Database()
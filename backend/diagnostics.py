@@ -0,0 +1,87 @@
+"""
+Slow-query diagnostics
+
+`Database` records every statement slower than `SLOW_QUERY_MS` here, with
+parameters redacted. A sample of them also gets an EXPLAIN plan captured on a
+side connection. The ring is bounded and is served to admins at
+`/api/admin/diagnostics/slow-queries`.
+"""
+import re
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Sequence
+
+_WHITESPACE = re.compile(r"\s+")
+_READ_PREFIX = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+# Writes, row locks and side-effecting functions a SELECT may still contain
+_WRITE_KEYWORDS = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|FOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)"
+    r"|nextval|setval|pg_notify|pg_advisory_\w+)\b",
+    re.IGNORECASE
+)
+
+
+def redact_params(args: Sequence[Any]) -> List[str]:
+    """
+    Replace query parameter values with their type names
+
+    Args:
+        args: Query parameters
+
+    Returns:
+        List like ['$1: int', '$2: str(36)'] that never contains values
+    """
+    redacted = []
+    for index, value in enumerate(args, start=1):
+        type_name = type(value).__name__
+        if isinstance(value, (str, bytes, list, tuple, dict)):
+            type_name = f"{type_name}({len(value)})"
+        redacted.append(f"${index}: {type_name}")
+    return redacted
+
+
+def normalise_sql(sql: str) -> str:
+    """Collapse whitespace so statements read on one line"""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def is_read_only(sql: str) -> bool:
+    """Check whether a statement is a plain SELECT, so EXPLAIN ANALYZE may run it"""
+    return _READ_PREFIX.match(sql) is not None and _WRITE_KEYWORDS.search(sql) is None
+
+
+class SlowQueryLog:
+    """Bounded ring of recent slow statements, newest last"""
+
+    def __init__(self, size: int):
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+
+    def record(self, pool: str, query: str, sql: str, args: Sequence[Any], duration_ms: float) -> Dict[str, Any]:
+        """
+        Store a slow statement
+
+        Args:
+            pool: Label of the pool the statement ran on
+            query: Statement name or SQL fingerprint
+            sql: Statement text
+            args: Query parameters (stored redacted)
+            duration_ms: Execution time in milliseconds
+
+        Returns:
+            The stored entry; `plan` is filled in later if it gets sampled
+        """
+        entry = {
+            "query": query,
+            "sql": normalise_sql(sql),
+            "params": redact_params(args),
+            "pool": pool,
+            "duration_ms": round(duration_ms, 2),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        return entry
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return a copy of the entries, newest first"""
+        return [dict(entry) for entry in reversed(self.entries)]
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import hmac
 import logging
+import time
 import database as db_module
+from metrics import registry as metrics_registry
+from utils.deadline import CancelOnDisconnectMiddleware
 from routes import auth, admin, forms, reports, client
 from config import settings
 
@@ -22,10 +29,19 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting FitMates V2 API...")
     await db.connect()
+    revocation_sync = asyncio.create_task(auth.revocation_sync_loop())
+    forms_listener = asyncio.create_task(
+        db.listen("forms_changed", forms.on_forms_changed, on_reconnect=forms.published_forms_cache.clear)
+    )
+    schema_gc = asyncio.create_task(forms.schema_gc_loop())
     logger.info("Application startup complete")
     yield
     # Shutdown
     logger.info("Shutting down FitMates V2 API...")
+    revocation_sync.cancel()
+    forms_listener.cancel()
+    schema_gc.cancel()
+    reports.cancel_report_jobs()
     await db.disconnect()
     logger.info("Application shutdown complete")
 
@@ -47,11 +63,41 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+@app.exception_handler(db_module.QueryTimeoutError)
+async def query_timeout_handler(request: Request, exc: db_module.QueryTimeoutError):
+    """Report an exhausted request deadline as a gateway timeout"""
+    logger.warning(f"Request deadline exceeded: {request.method} {request.url.path}")
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Request handling time by route template, including serialization",
+    ["method", "route", "status"]
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time API requests so handler/serialization cost can be compared with DB time"""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    if route is not None and request.url.path.startswith("/api/"):
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            request.method, route.path_format, str(response.status_code)
+        )
+    return response
+
+# Cancel handlers (and their running statements) when the client disconnects;
+# added last so it wraps every other middleware
+app.add_middleware(CancelOnDisconnectMiddleware)
+
 # Register API routes
 app.include_router(auth.router)
 app.include_router(admin.router)
@@ -73,6 +119,29 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+async def verify_metrics_access(authorization: Optional[str] = Header(None)):
+    """Accept the configured scrape token, or else an admin token"""
+    scrape_token = settings.METRICS_SCRAPE_TOKEN
+    if scrape_token and authorization and hmac.compare_digest(
+        authorization.encode(), f"Bearer {scrape_token}".encode()
+    ):
+        return
+    await admin.verify_admin(authorization)
+
+@app.get("/api/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_metrics_access)])
+async def metrics():
+    """
+    Prometheus metrics endpoint
+    
+    Exposes pool wait times, pool connection usage, per-query latency
+    histograms, query error counts and per-route request latency.
+    Requires METRICS_SCRAPE_TOKEN as a bearer token, or an admin login.
+    """
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 # Serve static files (frontend) - must be last
 import os
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend')
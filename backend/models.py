@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import date
+from typing import List, Optional
+from datetime import date, datetime
 
 # Authentication Models
 class LoginRequest(BaseModel):
@@ -58,6 +58,26 @@ class FormUpdate(BaseModel):
     data: Optional[dict] = None
     status: Optional[str] = None
 
+class FormAssign(BaseModel):
+    client_ids: Optional[List[int]] = None
+    all_clients: bool = False
+    publish: bool = False
+
+class FormAssignResponse(BaseModel):
+    form_id: str
+    status: str
+    assigned: int
+    missing_client_ids: List[int]
+
+class FormPatch(BaseModel):
+    updated_at: datetime
+    operations: List[dict]
+
+class FormPatchResponse(BaseModel):
+    id: str
+    client_id: int
+    updated_at: str
+
 class FormResponse(BaseModel):
     id: str
     client_id: int
@@ -68,6 +88,28 @@ class FormResponse(BaseModel):
     created_at: str
     updated_at: str
 
+class FormSummaryResponse(BaseModel):
+    id: str
+    client_id: int
+    title: str
+    status: str
+    is_template: bool
+    created_at: str
+    updated_at: str
+
+class DashboardFormResponse(BaseModel):
+    id: str
+    client_id: int
+    title: str
+    status: str
+    is_template: bool
+    created_at: str
+    updated_at: str
+    field_count: int
+    submission_id: Optional[str] = None
+    submitted_at: Optional[str] = None
+    submission_status: str
+
 # Submission Models
 class SubmissionCreate(BaseModel):
     client_id: int
@@ -81,12 +123,33 @@ class SubmissionResponse(BaseModel):
     data: dict
     submitted_at: str
 
+class SubmissionListResponse(SubmissionResponse):
+    form_title: Optional[str] = None
+
 # Report Models
 class ReportCreate(BaseModel):
     client_id: int
     submission_id: str
     period: str  # 'weekly' or 'monthly'
 
+class ReportJobCreate(BaseModel):
+    period: str  # 'weekly' or 'monthly'
+    submitted_from: date
+    submitted_to: date
+
+class ReportJobResponse(BaseModel):
+    id: str
+    period: str
+    submitted_from: str
+    submitted_to: str
+    status: str  # 'running', 'completed' or 'failed'
+    total: int
+    processed: int
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str] = None
+
 class ReportResponse(BaseModel):
     id: str
     client_id: int
@@ -94,3 +157,11 @@ class ReportResponse(BaseModel):
     generated_report_data: dict
     period: str
     created_at: str
+
+class ReportSummaryResponse(BaseModel):
+    id: str
+    client_id: int
+    submission_id: str
+    period: str
+    overall_score: Optional[float] = None
+    created_at: str
@@ -0,0 +1,515 @@
+"""
+Named SQL statement registry
+
+Every statement the API runs is declared here once and referenced by name.
+`Database` prepares all of them on each pooled connection when the connection
+is opened, so route handlers skip the parse/plan step on every call.
+"""
+from typing import Dict
+
+# Shared column lists
+CLIENT_COLUMNS = "id, name, email, dob, height, weight, mobile, medical_history, created_at, updated_at"
+FORM_COLUMNS = "id, client_id, title, data, status, is_template, created_at, updated_at"
+SUBMISSION_COLUMNS = "id, client_id, form_id, data, submitted_at"
+REPORT_COLUMNS = "id, client_id, submission_id, generated_report_data, period, created_at"
+# Form definitions live in form_schemas, deduplicated by content hash; the
+# form_documents view joins them back in under the `data` column. Writes
+# store definitions through store_form_schema(), which returns the hash.
+FORM_DATA = "(SELECT s.data FROM form_schemas s WHERE s.hash = forms.schema_hash)"
+FORM_RETURNING = "id, client_id, title, {data}, status, is_template, created_at, updated_at"
+# Summary projections leave out the large JSONB payload, so it is not sent;
+# report summaries pick only overall_score out of it
+FORM_SUMMARY_COLUMNS = "id, client_id, title, status, is_template, created_at, updated_at"
+REPORT_SUMMARY_COLUMNS = """id, client_id, submission_id, period,
+    generated_report_data->'overall_score' AS overall_score, created_at"""
+REPORT_JOB_COLUMNS = """id, period, submitted_from, submitted_to, status, total, processed, error,
+    created_at, updated_at, finished_at"""
+
+# JSON response bodies built in SQL, matching the API response models. The
+# JSONB columns are spliced in as stored, so handlers can pass the text
+# straight through without parsing it in Python.
+FORM_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'title', title, 'data', data,
+    'status', status, 'is_template', is_template,
+    'created_at', created_at, 'updated_at', updated_at
+)"""
+REPORT_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'submission_id', submission_id::text,
+    'generated_report_data', generated_report_data, 'period', period,
+    'created_at', created_at
+)"""
+FORM_SUMMARY_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'title', title,
+    'status', status, 'is_template', is_template,
+    'created_at', created_at, 'updated_at', updated_at
+)"""
+REPORT_SUMMARY_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'submission_id', submission_id::text,
+    'period', period, 'overall_score', overall_score,
+    'created_at', created_at
+)"""
+
+# Submission lists carry their form's title, so pages listing them don't
+# fetch each form. changed_at moves when the submission or its form changes,
+# so it versions a row for ETags.
+SUBMISSION_LIST_TABLE = """(
+    SELECT s.id, s.client_id, s.form_id, s.data, s.submitted_at, f.title AS form_title,
+           GREATEST(s.submitted_at, f.updated_at) AS changed_at
+    FROM submissions s
+    LEFT JOIN forms f ON f.id = s.form_id
+) submission_list"""
+SUBMISSION_LIST_COLUMNS = "id, client_id, form_id, data, submitted_at, form_title, changed_at"
+SUBMISSION_LIST_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'form_id', form_id::text, 'form_title', form_title,
+    'data', data, 'submitted_at', submitted_at
+)"""
+
+# Client dashboard: published forms with the client's latest submission of
+# each, attached by a LEFT JOIN LATERAL on uq_submissions_client_form.
+# changed_at moves whenever the form or its submission changes, so it
+# versions a dashboard row for ETags.
+DASHBOARD_TABLE = """(
+    SELECT f.id, f.client_id, f.title, f.schema_hash, f.status, f.is_template, f.created_at, f.updated_at,
+           latest.submission_id, latest.submitted_at,
+           GREATEST(f.updated_at, latest.submitted_at) AS changed_at
+    FROM forms f
+    LEFT JOIN LATERAL (
+        SELECT s.id AS submission_id, s.submitted_at
+        FROM submissions s
+        WHERE s.client_id = f.client_id AND s.form_id = f.id
+        ORDER BY s.submitted_at DESC
+        LIMIT 1
+    ) latest ON true
+) dashboard"""
+DASHBOARD_COLUMNS = """id, client_id, title, status, is_template, created_at, updated_at,
+    submission_id, submitted_at, changed_at,
+    (SELECT fs.field_count FROM form_schemas fs WHERE fs.hash = dashboard.schema_hash) AS field_count"""
+DASHBOARD_JSON = """json_build_object(
+    'id', id::text, 'client_id', client_id, 'title', title,
+    'status', status, 'is_template', is_template,
+    'created_at', created_at, 'updated_at', updated_at, 'field_count', field_count,
+    'submission_id', submission_id::text, 'submitted_at', submitted_at,
+    'submission_status', CASE WHEN submission_id IS NULL THEN 'pending' ELSE 'completed' END
+)"""
+
+
+def json_array(item: str, order_by: str) -> str:
+    """SQL expression aggregating `item` into a JSON array text, [] when empty"""
+    return f"COALESCE(json_agg({item} ORDER BY {order_by}), '[]')::text"
+
+
+def _page(columns: str, table: str, where: str, sort: str, after: int) -> str:
+    """`page` CTE: rows after the key ($after, $after+1), up to $after+2 of them"""
+    return f"""
+        WITH page AS (
+            SELECT {columns}
+            FROM {table}
+            WHERE {where} AND ({sort}, id) < (${after}, ${after + 1})
+            ORDER BY {sort} DESC, id DESC
+            LIMIT ${after + 2}
+        )"""
+
+
+def _page_version(sort: str, version: str) -> str:
+    """Digest of the page's row ids and versions, used for its ETag"""
+    return (f"md5(COALESCE(string_agg(id::text || '@' || {version}::text, ',' "
+            f"ORDER BY {sort} DESC, id DESC), ''))")
+
+
+def json_page(item: str, columns: str, table: str, where: str, sort: str, version: str, after: int) -> str:
+    """
+    Keyset-paginated JSON list statement
+    
+    Selects `columns` of rows in `table` matching `where` that sort after the
+    key ($after, $after+1) on (`sort` DESC, id DESC), up to $after+2 rows,
+    and returns the page as JSON text plus the key of its last row and a
+    digest of the rows' `version` column.
+    """
+    return _page(columns, table, where, sort, after) + f"""
+        SELECT {json_array(item, f"{sort} DESC, id DESC")} AS body,
+               count(*) AS count,
+               min({sort}) AS last_sort,
+               (array_agg(id ORDER BY {sort}, id))[1] AS last_id,
+               {_page_version(sort, version)} AS version
+        FROM page
+    """
+
+
+def page_version(table: str, where: str, sort: str, version: str, after: int) -> str:
+    """
+    Version-only twin of json_page, for answering If-None-Match
+    
+    Reads only keys and the version column, never the JSONB payloads.
+    """
+    columns = f"id, {sort}" if sort == version else f"id, {sort}, {version}"
+    return _page(columns, table, where, sort, after) + f"""
+        SELECT {_page_version(sort, version)}
+        FROM page
+    """
+
+
+def list_statement(name: str, view: str) -> str:
+    """Name of the full or summary variant of a JSON list statement"""
+    return f"{name}_summary_json" if view == "summary" else f"{name}_json"
+
+
+def version_statement(name: str) -> str:
+    """Name of the page_version statement for a JSON list"""
+    return f"{name}_version"
+
+
+STATEMENTS: Dict[str, str] = {
+    # Authentication
+    # Both principal tables in one round trip (each side is a unique-index
+    # lookup); admin rows sort first
+    "auth.identity_by_email": """
+        SELECT id::text AS id, email, password, 'admin' AS role, 'Admin' AS name
+        FROM admins WHERE email = $1
+        UNION ALL
+        SELECT id::text, email, password, 'client', name
+        FROM clients WHERE email = $1
+        ORDER BY role
+    """,
+    # Hash upgrades only apply if the password was not changed meanwhile;
+    # ids arrive as text from auth.identity_by_email
+    "auth.admin_set_password": """
+        UPDATE admins SET password = $2 WHERE id = $1::text::uuid AND password = $3
+    """,
+    "auth.client_set_password": """
+        UPDATE clients SET password = $2 WHERE id = $1::text::integer AND password = $3
+    """,
+
+    # Token revocation
+    # Rows revoked at or after $1; callers re-read an overlapping window
+    # because ids are not assigned in commit order
+    "auth.revocations_since": """
+        SELECT id, jti, subject, issued_before, expires_at, revoked_at
+        FROM token_revocations
+        WHERE revoked_at >= $1 AND expires_at > NOW()
+        ORDER BY id
+    """,
+    "auth.revoke_token": """
+        INSERT INTO token_revocations (jti, expires_at)
+        VALUES ($1, $2)
+        RETURNING id, jti, subject, issued_before, expires_at, revoked_at
+    """,
+    # Every token the subject holds now was issued before $2 (a whole-second
+    # cutoff from the app's clock, the one that stamps iat) and expires within
+    # one token lifetime ($3 minutes)
+    "auth.revoke_subject": """
+        INSERT INTO token_revocations (subject, issued_before, expires_at)
+        VALUES ($1, $2::timestamptz, $2::timestamptz + make_interval(mins => $3::int))
+        RETURNING id, jti, subject, issued_before, expires_at, revoked_at
+    """,
+    "auth.purge_revocations": """
+        DELETE FROM token_revocations WHERE expires_at < NOW()
+    """,
+
+    # Admin dashboard
+    "admin.analytics_counts": """
+        WITH counts AS (
+            SELECT
+                (SELECT COUNT(*) FROM clients) as total_clients,
+                (SELECT COUNT(*) FROM forms) as total_forms,
+                (SELECT COUNT(*) FROM forms WHERE status = 'published') as published_forms,
+                (SELECT COUNT(*) FROM submissions) as total_submissions,
+                (SELECT COUNT(*) FROM reports) as total_reports
+        )
+        SELECT * FROM counts
+    """,
+    "admin.recent_submissions": """
+        SELECT s.id, s.submitted_at, c.name as client_name, f.title as form_title
+        FROM submissions s
+        JOIN clients c ON s.client_id = c.id
+        JOIN forms f ON s.form_id = f.id
+        ORDER BY s.submitted_at DESC
+        LIMIT 5
+    """,
+
+    # Clients
+    # Keyset-paginated on (created_at, id), see utils/pagination.py
+    "clients.list": f"""
+        SELECT {CLIENT_COLUMNS}
+        FROM clients
+        WHERE (created_at, id) < ($1, $2)
+        ORDER BY created_at DESC, id DESC
+        LIMIT $3
+    """,
+    "clients.get": f"""
+        SELECT {CLIENT_COLUMNS}
+        FROM clients
+        WHERE id = $1
+    """,
+    "clients.version": """
+        SELECT updated_at FROM clients WHERE id = $1
+    """,
+    "clients.exists": """
+        SELECT id FROM clients WHERE id = $1
+    """,
+    "clients.id_by_email": """
+        SELECT id FROM clients WHERE email = $1
+    """,
+    # No row back means the email was registered in the meantime
+    "clients.insert": f"""
+        INSERT INTO clients (name, email, password, dob, height, weight, mobile, medical_history)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (email) DO NOTHING
+        RETURNING {CLIENT_COLUMNS}
+    """,
+    # Partial update: NULL parameters keep the current column value
+    "clients.update": f"""
+        UPDATE clients
+        SET name = COALESCE($1::varchar, name),
+            dob = COALESCE($2::date, dob),
+            height = COALESCE($3::numeric, height),
+            weight = COALESCE($4::numeric, weight),
+            mobile = COALESCE($5::varchar, mobile),
+            medical_history = COALESCE($6::varchar, medical_history),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = $7
+        RETURNING {CLIENT_COLUMNS}
+    """,
+    "clients.delete": """
+        DELETE FROM clients WHERE id = $1 RETURNING id
+    """,
+
+    # Forms
+    "forms.by_client_json": json_page(
+        FORM_JSON, FORM_COLUMNS, "form_documents", "client_id = $1", "created_at", "updated_at", 2
+    ),
+    "forms.by_client_summary_json": json_page(
+        FORM_SUMMARY_JSON, FORM_SUMMARY_COLUMNS, "forms", "client_id = $1", "created_at", "updated_at", 2
+    ),
+    "forms.by_client_version": page_version("forms", "client_id = $1", "created_at", "updated_at", 2),
+    "forms.published_by_client_json": json_page(
+        FORM_JSON, FORM_COLUMNS, "form_documents", "client_id = $1 AND status = 'published'", "created_at", "updated_at", 2
+    ),
+    "forms.published_by_client_summary_json": json_page(
+        FORM_SUMMARY_JSON, FORM_SUMMARY_COLUMNS, "forms", "client_id = $1 AND status = 'published'", "created_at",
+        "updated_at", 2
+    ),
+    "forms.published_by_client_version": page_version(
+        "forms", "client_id = $1 AND status = 'published'", "created_at", "updated_at", 2
+    ),
+    "forms.templates_json": json_page(
+        FORM_JSON, FORM_COLUMNS, "form_documents", "is_template = true", "created_at", "updated_at", 1
+    ),
+    "forms.templates_summary_json": json_page(
+        FORM_SUMMARY_JSON, FORM_SUMMARY_COLUMNS, "forms", "is_template = true", "created_at", "updated_at", 1
+    ),
+    "forms.templates_version": page_version("forms", "is_template = true", "created_at", "updated_at", 1),
+    "forms.dashboard_json": json_page(
+        DASHBOARD_JSON, DASHBOARD_COLUMNS, DASHBOARD_TABLE, "client_id = $1 AND status = 'published'", "created_at",
+        "changed_at", 2
+    ),
+    "forms.dashboard_version": page_version(
+        DASHBOARD_TABLE, "client_id = $1 AND status = 'published'", "created_at", "changed_at", 2
+    ),
+    # Same rows for every status, for the admin's view of a client
+    "forms.dashboard_all_json": json_page(
+        DASHBOARD_JSON, DASHBOARD_COLUMNS, DASHBOARD_TABLE, "client_id = $1", "created_at", "changed_at", 2
+    ),
+    "forms.dashboard_all_version": page_version(DASHBOARD_TABLE, "client_id = $1", "created_at", "changed_at", 2),
+    "forms.get_json": f"""
+        SELECT client_id, updated_at, {FORM_JSON}::text AS body
+        FROM form_documents
+        WHERE id = $1
+    """,
+    "forms.version": """
+        SELECT client_id, updated_at FROM forms WHERE id = $1
+    """,
+    "forms.exists": """
+        SELECT id FROM forms WHERE id = $1
+    """,
+    "forms.validation_schema": """
+        SELECT client_id, updated_at, data->'fields' AS fields FROM form_documents WHERE id = $1
+    """,
+    "forms.get_data": """
+        SELECT data FROM form_documents WHERE id = $1
+    """,
+    "forms.insert": f"""
+        INSERT INTO forms (client_id, title, schema_hash, status, is_template)
+        VALUES ($1, $2, store_form_schema($3), $4, $5)
+        RETURNING {FORM_RETURNING.format(data="$3::jsonb AS data")}
+    """,
+    # Copies share the source's stored definition
+    "forms.copy": """
+        WITH copied AS (
+            INSERT INTO forms (client_id, title, schema_hash, status, is_template)
+            SELECT $2, title || ' (Copy)', schema_hash, 'draft', false
+            FROM forms
+            WHERE id = $1
+            RETURNING *
+        )
+        SELECT copied.id, copied.client_id, copied.title, s.data, copied.status, copied.is_template,
+               copied.created_at, copied.updated_at
+        FROM copied
+        JOIN form_schemas s ON s.hash = copied.schema_hash
+    """,
+    # Copy one form to many clients in a single statement: every client in
+    # $2, or all clients when $2 is NULL. Unknown ids simply match no row.
+    "forms.assign": """
+        INSERT INTO forms (client_id, title, schema_hash, status, is_template)
+        SELECT c.id, f.title, f.schema_hash, $3, false
+        FROM forms f
+        CROSS JOIN clients c
+        WHERE f.id = $1
+          AND ($2::integer[] IS NULL OR c.id = ANY($2::integer[]))
+        RETURNING client_id
+    """,
+    # Partial update: NULL parameters keep the current column value. New data
+    # is stored as its own definition (copy-on-write), so other forms that
+    # shared the old one are unaffected.
+    "forms.update": f"""
+        UPDATE forms
+        SET title = COALESCE($1::varchar, title),
+            schema_hash = COALESCE(store_form_schema($2::jsonb), schema_hash),
+            status = COALESCE($3::varchar, status),
+            updated_at = NOW()
+        WHERE id = $4
+        RETURNING {FORM_RETURNING.format(data=f"COALESCE($2::jsonb, {FORM_DATA}) AS data")}
+    """,
+    # JSON Patch: lock the row, apply the patch in Python, write it back
+    "forms.lock_content": """
+        SELECT f.title, s.data, f.updated_at
+        FROM forms f
+        JOIN form_schemas s ON s.hash = f.schema_hash
+        WHERE f.id = $1
+        FOR UPDATE OF f
+    """,
+    "forms.set_content": """
+        UPDATE forms
+        SET title = $2, schema_hash = store_form_schema($3), updated_at = NOW()
+        WHERE id = $1
+        RETURNING id, client_id, updated_at
+    """,
+    "forms.set_status": f"""
+        UPDATE forms
+        SET status = $2, updated_at = CURRENT_TIMESTAMP
+        WHERE id = $1
+        RETURNING {FORM_RETURNING.format(data=f"{FORM_DATA} AS data")}
+    """,
+    # Drop definitions no form references any more. Rows locked by a
+    # concurrent store_form_schema() are about to be reused and are skipped.
+    "form_schemas.collect_garbage": """
+        DELETE FROM form_schemas
+        WHERE hash IN (
+            SELECT s.hash
+            FROM form_schemas s
+            WHERE NOT EXISTS (SELECT 1 FROM forms f WHERE f.schema_hash = s.hash)
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+    """,
+    "forms.delete": """
+        DELETE FROM forms WHERE id = $1 RETURNING client_id
+    """,
+
+    # Submissions
+    "submissions.by_client_json": json_page(
+        SUBMISSION_LIST_JSON, SUBMISSION_LIST_COLUMNS, SUBMISSION_LIST_TABLE, "client_id = $1",
+        "submitted_at", "changed_at", 2
+    ),
+    "submissions.by_client_version": page_version(
+        SUBMISSION_LIST_TABLE, "client_id = $1", "submitted_at", "changed_at", 2
+    ),
+    "submissions.get": """
+        SELECT id, client_id, form_id, data
+        FROM submissions
+        WHERE id = $1
+    """,
+    # A form belongs to one client, so it has at most one submission. The
+    # form's owner comes back even when there is none, for the access check
+    "submissions.by_form": """
+        SELECT f.client_id AS owner_id, s.id, s.client_id, s.form_id, s.data, s.submitted_at
+        FROM forms f
+        LEFT JOIN submissions s ON s.form_id = f.id
+        WHERE f.id = $1
+    """,
+    # Ownership check and insert-or-update in one statement: no row back
+    # means the form does not belong to the client
+    # Only inserts while the form is still at the version ($4, updated_at)
+    # the data was validated against
+    "submissions.upsert": f"""
+        INSERT INTO submissions (client_id, form_id, data)
+        SELECT f.client_id, f.id, $3
+        FROM forms f
+        WHERE f.id = $2 AND f.client_id = $1 AND f.updated_at = $4
+        ON CONFLICT (client_id, form_id) DO UPDATE
+        SET data = EXCLUDED.data, submitted_at = CURRENT_TIMESTAMP
+        RETURNING {SUBMISSION_COLUMNS}
+    """,
+
+    # Reports
+    # Reports never change after insert, so created_at is their version
+    "reports.by_client_json": json_page(
+        REPORT_JSON, REPORT_COLUMNS, "reports", "client_id = $1", "created_at", "created_at", 2
+    ),
+    "reports.by_client_summary_json": json_page(
+        REPORT_SUMMARY_JSON, REPORT_SUMMARY_COLUMNS, "reports", "client_id = $1", "created_at", "created_at", 2
+    ),
+    "reports.by_client_version": page_version("reports", "client_id = $1", "created_at", "created_at", 2),
+    "reports.get_json": f"""
+        SELECT client_id, {REPORT_JSON}::text AS body
+        FROM reports
+        WHERE id = $1
+    """,
+    "reports.owner": """
+        SELECT client_id FROM reports WHERE id = $1
+    """,
+    "reports.insert": f"""
+        INSERT INTO reports (client_id, submission_id, generated_report_data, period)
+        VALUES ($1, $2, $3, $4)
+        RETURNING {REPORT_COLUMNS}
+    """,
+    "reports.delete": """
+        DELETE FROM reports WHERE id = $1 RETURNING id
+    """,
+
+    # Batch report jobs
+    # A submission needs a report for a period when it has none of that
+    # period generated since it was last (re)submitted
+    "report_jobs.insert": f"""
+        INSERT INTO report_jobs (period, submitted_from, submitted_to, total)
+        SELECT $1::varchar, $2, $3, count(*)
+        FROM submissions s
+        WHERE s.submitted_at >= $2::date AND s.submitted_at < $3::date + 1
+          AND NOT EXISTS (
+              SELECT 1 FROM reports r
+              WHERE r.submission_id = s.id AND r.period = $1::varchar AND r.created_at >= s.submitted_at
+          )
+        ON CONFLICT (status) WHERE status = 'running' DO NOTHING
+        RETURNING {REPORT_JOB_COLUMNS}
+    """,
+    "report_jobs.get": f"""
+        SELECT {REPORT_JOB_COLUMNS} FROM report_jobs WHERE id = $1
+    """,
+    # Jobs whose worker stopped updating them for $1 seconds
+    "report_jobs.fail_stale": """
+        UPDATE report_jobs
+        SET status = 'failed', error = 'Job stopped responding', finished_at = NOW()
+        WHERE status = 'running' AND updated_at < NOW() - make_interval(secs => $1)
+    """,
+    # Next chunk of submissions needing a report, keyset-ordered by id
+    "report_jobs.pending_submissions": """
+        SELECT s.id, s.client_id, s.data, d.data AS form_data
+        FROM submissions s
+        JOIN form_documents d ON d.id = s.form_id
+        WHERE s.submitted_at >= $2::date AND s.submitted_at < $3::date + 1
+          AND s.id > $4
+          AND NOT EXISTS (
+              SELECT 1 FROM reports r
+              WHERE r.submission_id = s.id AND r.period = $1::varchar AND r.created_at >= s.submitted_at
+          )
+        ORDER BY s.id
+        LIMIT $5
+    """,
+    "report_jobs.progress": """
+        UPDATE report_jobs SET processed = processed + $2, updated_at = NOW() WHERE id = $1
+    """,
+    "report_jobs.finish": """
+        UPDATE report_jobs
+        SET status = $2, error = $3, updated_at = NOW(), finished_at = NOW()
+        WHERE id = $1 AND status = 'running'
+    """,
+}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Response
 from typing import List, Optional
 import logging
 import database as db_module
 import models
-from utils import hash_password, get_token_data
+from utils import hash_password_async, get_principal
+from utils.auth import revocation_cutoff, revocations
 from utils.helpers import format_datetime
+from utils.deadline import read_deadline, write_deadline
+from utils.pagination import FIRST_PAGE_INT, PageParams, int_id, set_next_cursor
+from config import settings
 
 db = db_module.db
 logger = logging.getLogger(__name__)
@@ -28,15 +32,14 @@ async def verify_admin(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing authorization header")
     
-    token = authorization.split(" ")[1]
-    token_data = get_token_data(token)
+    token_data = get_principal(authorization)
     
     if not token_data or token_data['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
     return token_data
 
-@router.get("/dashboard/analytics")
+@router.get("/dashboard/analytics", dependencies=[Depends(read_deadline)])
 async def get_dashboard_analytics(admin: dict = Depends(verify_admin)):
     """
     Get analytics data for admin dashboard
@@ -48,29 +51,10 @@ async def get_dashboard_analytics(admin: dict = Depends(verify_admin)):
     """
     try:
         # Optimized single query using CTE for all counts
-        analytics_query = """
-            WITH counts AS (
-                SELECT
-                    (SELECT COUNT(*) FROM clients) as total_clients,
-                    (SELECT COUNT(*) FROM forms) as total_forms,
-                    (SELECT COUNT(*) FROM forms WHERE status = 'published') as published_forms,
-                    (SELECT COUNT(*) FROM submissions) as total_submissions,
-                    (SELECT COUNT(*) FROM reports) as total_reports
-            )
-            SELECT * FROM counts;
-        """
-        
-        counts = await db.fetchrow(analytics_query)
+        counts = await db.fetchrow("admin.analytics_counts", read_only=True)
         
         # Get recent submissions separately (still efficient with proper indexes)
-        recent_submissions = await db.fetch("""
-            SELECT s.id, s.submitted_at, c.name as client_name, f.title as form_title
-            FROM submissions s
-            JOIN clients c ON s.client_id = c.id
-            JOIN forms f ON s.form_id = f.id
-            ORDER BY s.submitted_at DESC
-            LIMIT 5
-        """)
+        recent_submissions = await db.fetch("admin.recent_submissions", read_only=True)
         
         return {
             "total_clients": counts['total_clients'],
@@ -92,15 +76,14 @@ async def get_dashboard_analytics(admin: dict = Depends(verify_admin)):
         logger.error(f"Error fetching dashboard analytics: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch dashboard analytics")
 
-@router.get("/clients", response_model=List[models.ClientResponse])
-async def get_all_clients(admin: dict = Depends(verify_admin)):
-    """Get all clients"""
+@router.get("/clients", response_model=List[models.ClientResponse], dependencies=[Depends(read_deadline)])
+async def get_all_clients(response: Response, page: PageParams = Depends(), admin: dict = Depends(verify_admin)):
+    """Get a page of clients, newest first"""
+    
+    clients = await db.fetch("clients.list", *page.after(int_id, FIRST_PAGE_INT), page.limit, read_only=True)
     
-    clients = await db.fetch("""
-        SELECT id, name, email, dob, height, weight, mobile, medical_history, created_at
-        FROM clients
-        ORDER BY created_at DESC
-    """)
+    if clients:
+        set_next_cursor(response, page, len(clients), clients[-1]['created_at'], clients[-1]['id'])
     
     return [
         {
@@ -117,15 +100,11 @@ async def get_all_clients(admin: dict = Depends(verify_admin)):
         for row in clients
     ]
 
-@router.get("/clients/{client_id}", response_model=models.ClientResponse)
+@router.get("/clients/{client_id}", response_model=models.ClientResponse, dependencies=[Depends(read_deadline)])
 async def get_client(client_id: int, admin: dict = Depends(verify_admin)):
     """Get a specific client by ID"""
     
-    client = await db.fetchrow("""
-        SELECT id, name, email, dob, height, weight, mobile, medical_history, created_at
-        FROM clients
-        WHERE id = $1
-    """, client_id)
+    client = await db.fetchrow("clients.get", client_id, read_only=True)
     
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
@@ -142,25 +121,23 @@ async def get_client(client_id: int, admin: dict = Depends(verify_admin)):
         "created_at": client['created_at'].isoformat()
     }
 
-@router.post("/clients", response_model=models.ClientResponse)
+@router.post("/clients", response_model=models.ClientResponse, dependencies=[Depends(write_deadline)])
 async def create_client(client: models.ClientCreate, admin: dict = Depends(verify_admin)):
     """Create a new client"""
     
-    # Check if email already exists
-    existing = await db.fetchval("SELECT id FROM clients WHERE email = $1", client.email)
+    # Check if email already exists, before spending a bcrypt hash on it
+    existing = await db.fetchval("clients.id_by_email", client.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = hash_password(client.password)
+    hashed_password = await hash_password_async(client.password)
     
-    # Insert client
-    new_client = await db.fetchrow("""
-        INSERT INTO clients (name, email, password, dob, height, weight, mobile, medical_history)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        RETURNING id, name, email, dob, height, weight, mobile, medical_history, created_at
-    """, client.name, client.email, hashed_password, client.dob, client.height, 
-        client.weight, client.mobile, client.medical_history)
+    # Insert client; the unique email index catches a concurrent create
+    new_client = await db.fetchrow("clients.insert", client.name, client.email, hashed_password, client.dob,
+        client.height, client.weight, client.mobile, client.medical_history)
+    if not new_client:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     return {
         "id": new_client['id'],
@@ -174,68 +151,24 @@ async def create_client(client: models.ClientCreate, admin: dict = Depends(verif
         "created_at": new_client['created_at'].isoformat()
     }
 
-@router.put("/clients/{client_id}", response_model=models.ClientResponse)
+@router.put("/clients/{client_id}", response_model=models.ClientResponse, dependencies=[Depends(write_deadline)])
 async def update_client(client_id: int, client_update: models.ClientUpdate, admin: dict = Depends(verify_admin)):
     """Update a client"""
     
-    # Check if client exists
-    existing = await db.fetchrow("SELECT id FROM clients WHERE id = $1", client_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Client not found")
-    
-    # Build update query dynamically
-    update_fields = []
-    values = []
-    param_count = 1
-    
-    if client_update.name is not None:
-        update_fields.append(f"name = ${param_count}")
-        values.append(client_update.name)
-        param_count += 1
-    
-    if client_update.dob is not None:
-        update_fields.append(f"dob = ${param_count}")
-        values.append(client_update.dob)
-        param_count += 1
-    
-    if client_update.height is not None:
-        update_fields.append(f"height = ${param_count}")
-        values.append(client_update.height)
-        param_count += 1
-    
-    if client_update.weight is not None:
-        update_fields.append(f"weight = ${param_count}")
-        values.append(client_update.weight)
-        param_count += 1
-    
-    if client_update.mobile is not None:
-        update_fields.append(f"mobile = ${param_count}")
-        values.append(client_update.mobile)
-        param_count += 1
-    
-    if client_update.medical_history is not None:
-        update_fields.append(f"medical_history = ${param_count}")
-        values.append(client_update.medical_history)
-        param_count += 1
-    
-    if not update_fields:
+    if not client_update.model_dump(exclude_none=True):
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    # Add updated_at
-    update_fields.append(f"updated_at = CURRENT_TIMESTAMP")
-    
-    # Add client_id to values
-    values.append(client_id)
-    
-    # Execute update
-    query = f"""
-        UPDATE clients
-        SET {', '.join(update_fields)}
-        WHERE id = ${param_count}
-        RETURNING id, name, email, dob, height, weight, mobile, medical_history, created_at
-    """
+    # Single prepared statement covers every combination of fields;
+    # no row back means the client does not exist
+    updated_client = await db.fetchrow(
+        "clients.update",
+        client_update.name, client_update.dob, client_update.height,
+        client_update.weight, client_update.mobile, client_update.medical_history,
+        client_id
+    )
     
-    updated_client = await db.fetchrow(query, *values)
+    if not updated_client:
+        raise HTTPException(status_code=404, detail="Client not found")
     
     return {
         "id": updated_client['id'],
@@ -249,16 +182,45 @@ async def update_client(client_id: int, client_update: models.ClientUpdate, admi
         "created_at": updated_client['created_at'].isoformat()
     }
 
-@router.delete("/clients/{client_id}")
+@router.delete("/clients/{client_id}", dependencies=[Depends(write_deadline)])
 async def delete_client(client_id: int, admin: dict = Depends(verify_admin)):
     """Delete a client"""
     
-    # Check if client exists
-    existing = await db.fetchrow("SELECT id FROM clients WHERE id = $1", client_id)
-    if not existing:
+    # Cascade handles related records; no row back means no such client
+    deleted = await db.fetchval("clients.delete", client_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    # Delete client (cascade will handle related records)
-    await db.execute("DELETE FROM clients WHERE id = $1", client_id)
-    
     return {"message": "Client deleted successfully"}
+
+@router.post("/clients/{client_id}/revoke-sessions", dependencies=[Depends(write_deadline)])
+async def revoke_client_sessions(client_id: int, admin: dict = Depends(verify_admin)):
+    """Revoke every token issued to a client so far"""
+    
+    async with db.transaction() as tx:
+        existing = await tx.fetchrow("clients.exists", client_id)
+        if not existing:
+            raise HTTPException(status_code=404, detail="Client not found")
+        
+        row = await tx.fetchrow("auth.revoke_subject", f"client:{client_id}",
+            revocation_cutoff(), settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    
+    # Take effect in this worker now; others pick it up on their next sync
+    revocations.apply([row])
+    
+    return {"message": "Client sessions revoked successfully"}
+
+@router.get("/diagnostics/slow-queries")
+async def get_slow_queries(admin: dict = Depends(verify_admin)):
+    """
+    Get recent slow statements with redacted parameters
+    
+    Returns:
+        Dict with the configured threshold and the slow-query ring, newest
+        first; sampled entries include an EXPLAIN plan
+    """
+    return {
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "explain_sample_rate": settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        "queries": db.slow_queries.snapshot()
+    }
@@ -1,78 +1,88 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Request
 from typing import Optional
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
 import database as db_module
 import models
-from utils import verify_password, create_access_token
+from utils import verify_password_async, create_access_token
+from utils.password import hash_password_async, needs_rehash
+from utils.rate_limit import client_address, login_throttle
+from utils.auth import get_principal, revocations
+from utils.deadline import write_deadline
+from config import settings
 
 db = db_module.db
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+async def upgrade_password_hash(statement: str, user_id, password: str, old_hash: str):
+    """
+    Re-hash a password stored with an outdated scheme
+    
+    Runs as a background task after the login response is sent.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+        await db.execute(statement, user_id, new_hash, old_hash)
+    except Exception as e:
+        logger.warning(f"Password hash upgrade failed for {user_id}: {e}")
+
 @router.post("/login", response_model=models.TokenResponse)
-async def login(credentials: models.LoginRequest):
+async def login(credentials: models.LoginRequest, request: Request, background_tasks: BackgroundTasks):
     """Login endpoint for both admin and client users"""
     
-    # Try to find user in admins table
-    admin = await db.fetchrow(
-        "SELECT id, email, password FROM admins WHERE email = $1",
-        credentials.email
-    )
-    
-    if admin:
-        # Verify admin password
-        if verify_password(credentials.password, admin['password']):
-            # Create JWT token
-            token = create_access_token({
-                "sub": str(admin['id']),
-                "email": admin['email'],
-                "role": "admin"
-            })
-            
-            return models.TokenResponse(
-                access_token=token,
-                role="admin",
-                user_id=str(admin['id']),
-                email=admin['email'],
-                name="Admin"
-            )
+    # Throttle before touching the database or the hashing pool
+    client_ip = client_address(request)
+    retry_after = login_throttle.check(credentials.email, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
     
-    # Try to find user in clients table
-    client = await db.fetchrow(
-        "SELECT id, email, password, name FROM clients WHERE email = $1",
-        credentials.email
-    )
+    # Look up the email in admins and clients at once; an admin match is
+    # tried first, as before
+    identities = await db.fetch("auth.identity_by_email", credentials.email)
     
-    if client:
-        # Verify client password
-        if verify_password(credentials.password, client['password']):
+    for identity in identities:
+        if await verify_password_async(credentials.password, identity['password']):
+            login_throttle.record_success(credentials.email)
+            if needs_rehash(identity['password']):
+                background_tasks.add_task(upgrade_password_hash, f"auth.{identity['role']}_set_password",
+                    identity['id'], credentials.password, identity['password'])
+            
             # Create JWT token
             token = create_access_token({
-                "sub": str(client['id']),
-                "email": client['email'],
-                "role": "client"
+                "sub": identity['id'],
+                "email": identity['email'],
+                "role": identity['role']
             })
             
             return models.TokenResponse(
                 access_token=token,
-                role="client",
-                user_id=str(client['id']),
-                email=client['email'],
-                name=client['name']
+                role=identity['role'],
+                user_id=identity['id'],
+                email=identity['email'],
+                name=identity['name']
             )
     
     # Invalid credentials
+    login_throttle.record_failure(credentials.email)
     raise HTTPException(status_code=401, detail="Invalid email or password")
 
 @router.get("/verify")
 async def verify_token(authorization: Optional[str] = Header(None)):
     """Verify JWT token"""
-    from utils import get_token_data
     
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
-    token = authorization.split(" ")[1]
-    token_data = get_token_data(token)
+    token_data = get_principal(authorization)
     
     if not token_data:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -83,3 +93,55 @@ async def verify_token(authorization: Optional[str] = Header(None)):
         "role": token_data['role'],
         "email": token_data['email']
     }
+
+@router.post("/logout", dependencies=[Depends(write_deadline)])
+async def logout(authorization: Optional[str] = Header(None)):
+    """Revoke the token used for this request"""
+    
+    token_data = get_principal(authorization)
+    
+    if not token_data:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    if not token_data['jti'] or not token_data['expires_at']:
+        # Issued before tokens carried an id; it can only expire
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+    
+    expires_at = datetime.fromtimestamp(token_data['expires_at'], tz=timezone.utc)
+    row = await db.fetchrow("auth.revoke_token", token_data['jti'], expires_at)
+    # Take effect in this worker now; others pick it up on their next sync
+    revocations.apply([row])
+    
+    return {"message": "Logged out successfully"}
+
+async def sync_revocations():
+    """Pull token_revocations rows revoked since shortly before the last sync"""
+    since = revocations.window_start(settings.TOKEN_REVOCATION_OVERLAP_SECONDS)
+    rows = await db.fetch("auth.revocations_since", since)
+    revocations.apply(rows)
+    revocations.forget_seen(settings.TOKEN_REVOCATION_OVERLAP_SECONDS)
+    revocations.prune()
+
+async def revocation_sync_loop():
+    """
+    Keep this worker's revocation snapshot current
+    
+    Started from the application lifespan; runs until cancelled.
+    """
+    try:
+        await db.execute("auth.purge_revocations")
+    except Exception as e:
+        logger.warning(f"Purging expired token revocations failed: {e}")
+    
+    last_reload = time.monotonic()
+    while True:
+        # Backstop for a row committed later than the overlap window allows
+        if (settings.TOKEN_REVOCATION_RELOAD_SECONDS
+                and time.monotonic() - last_reload >= settings.TOKEN_REVOCATION_RELOAD_SECONDS):
+            revocations.reload()
+            last_reload = time.monotonic()
+        try:
+            await sync_revocations()
+        except Exception as e:
+            logger.warning(f"Token revocation sync failed: {e}")
+        await asyncio.sleep(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
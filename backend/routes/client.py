@@ -1,29 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 import database as db_module
 import models
 from routes.forms import verify_auth
+from utils.deadline import read_deadline, write_deadline
+from utils.etag import etag_matches, make_etag, not_modified, set_etag
 
 db = db_module.db
 
 router = APIRouter(prefix="/api/client", tags=["Client"])
 
-@router.get("/profile", response_model=models.ClientResponse)
-async def get_my_profile(user: dict = Depends(verify_auth)):
+@router.get("/profile", response_model=models.ClientResponse, dependencies=[Depends(read_deadline)])
+async def get_my_profile(request: Request, response: Response, user: dict = Depends(verify_auth)):
     """Get current client's profile"""
     
     # Only clients can access this endpoint
     if user['role'] != 'client':
         raise HTTPException(status_code=403, detail="Client access only")
     
-    client = await db.fetchrow("""
-        SELECT id, name, email, dob, height, weight, mobile, medical_history, created_at
-        FROM clients
-        WHERE id = $1
-    """, int(user['user_id']))
+    client_id = int(user['user_id'])
+    
+    # Read from the primary so a client sees their own profile edits at once
+    # Revalidation only needs the profile's version
+    if request.headers.get("if-none-match"):
+        updated_at = await db.fetchval("clients.version", client_id)
+        etag = make_etag("client", client_id, updated_at)
+        if updated_at is not None and etag_matches(request, etag):
+            return not_modified(etag)
+    
+    client = await db.fetchrow("clients.get", client_id)
     
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
+    set_etag(response, make_etag("client", client_id, client['updated_at']))
+    
     return {
         "id": client['id'],
         "name": client['name'],
@@ -36,7 +46,7 @@ async def get_my_profile(user: dict = Depends(verify_auth)):
         "created_at": client['created_at'].isoformat()
     }
 
-@router.put("/profile", response_model=models.ClientResponse)
+@router.put("/profile", response_model=models.ClientResponse, dependencies=[Depends(write_deadline)])
 async def update_my_profile(client_update: models.ClientUpdate, user: dict = Depends(verify_auth)):
     """Update current client's profile"""
     
@@ -46,59 +56,16 @@ async def update_my_profile(client_update: models.ClientUpdate, user: dict = Dep
     
     client_id = int(user['user_id'])
     
-    # Build update query dynamically
-    update_fields = []
-    values = []
-    param_count = 1
-    
-    if client_update.name is not None:
-        update_fields.append(f"name = ${param_count}")
-        values.append(client_update.name)
-        param_count += 1
-    
-    if client_update.dob is not None:
-        update_fields.append(f"dob = ${param_count}")
-        values.append(client_update.dob)
-        param_count += 1
-    
-    if client_update.height is not None:
-        update_fields.append(f"height = ${param_count}")
-        values.append(client_update.height)
-        param_count += 1
-    
-    if client_update.weight is not None:
-        update_fields.append(f"weight = ${param_count}")
-        values.append(client_update.weight)
-        param_count += 1
-    
-    if client_update.mobile is not None:
-        update_fields.append(f"mobile = ${param_count}")
-        values.append(client_update.mobile)
-        param_count += 1
-    
-    if client_update.medical_history is not None:
-        update_fields.append(f"medical_history = ${param_count}")
-        values.append(client_update.medical_history)
-        param_count += 1
-    
-    if not update_fields:
+    if not client_update.model_dump(exclude_none=True):
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    # Add updated_at
-    update_fields.append(f"updated_at = CURRENT_TIMESTAMP")
-    
-    # Add client_id to values
-    values.append(client_id)
-    
-    # Execute update
-    query = f"""
-        UPDATE clients
-        SET {', '.join(update_fields)}
-        WHERE id = ${param_count}
-        RETURNING id, name, email, dob, height, weight, mobile, medical_history, created_at
-    """
-    
-    updated_client = await db.fetchrow(query, *values)
+    # Single prepared statement covers every combination of fields
+    updated_client = await db.fetchrow(
+        "clients.update",
+        client_update.name, client_update.dob, client_update.height,
+        client_update.weight, client_update.mobile, client_update.medical_history,
+        client_id
+    )
     
     return {
         "id": updated_client['id'],
@@ -1,11 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from typing import List
-import json
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from typing import List, Optional, Set, Union
+import asyncio
+import logging
+from datetime import timezone
 import models
 import database as db_module
-from utils.auth import get_token_data
+from database import QueryTimeoutError
+from utils.auth import get_principal
+from utils.deadline import read_deadline, write_deadline
+from utils.pagination import ListView, PageParams, json_page_response
+from utils.helpers import raw_json_response
+from utils.etag import etag_matches, make_etag, not_modified, set_etag
+from utils.cache import LRUCache
+from utils.form_validation import cached_validator, store_validator
+from utils.json_patch import JsonPatchError, apply_patch
+from queries import list_statement, version_statement
+from config import settings
 
 db = db_module.db
+logger = logging.getLogger(__name__)
+
+# First pages of /published/{client_id}, keyed by (client_id, view, limit).
+# Admin write paths invalidate their client here; the forms_changed trigger
+# invalidates it in every other worker via LISTEN/NOTIFY.
+published_forms_cache = LRUCache(
+    "published_forms", settings.PUBLISHED_FORMS_CACHE_SIZE, settings.PUBLISHED_FORMS_CACHE_TTL_SECONDS
+)
+
+def invalidate_published_forms(client_id: Optional[int]):
+    """Drop cached published-form pages for a client"""
+    if client_id is not None:
+        published_forms_cache.discard_where(lambda key: key[0] == client_id)
+
+def invalidate_published_forms_for(client_ids: Set[int]):
+    """Drop cached published-form pages for many clients in one pass"""
+    if client_ids:
+        published_forms_cache.discard_where(lambda key: key[0] in client_ids)
+
+async def collect_schema_garbage() -> int:
+    """Delete form definitions no form references; returns how many"""
+    deleted = 0
+    while True:
+        status = await db.execute("form_schemas.collect_garbage", settings.FORM_SCHEMA_GC_BATCH_SIZE)
+        batch = int(status.split()[-1])
+        deleted += batch
+        if batch < settings.FORM_SCHEMA_GC_BATCH_SIZE:
+            return deleted
+
+async def schema_gc_loop():
+    """
+    Periodically collect unreferenced form definitions
+    
+    Started from the application lifespan; runs until cancelled. Every
+    worker runs it; concurrent runs skip each other's locked rows.
+    """
+    while True:
+        await asyncio.sleep(settings.FORM_SCHEMA_GC_INTERVAL_SECONDS)
+        try:
+            deleted = await collect_schema_garbage()
+            if deleted:
+                logger.info(f"Deleted {deleted} unreferenced form definitions")
+        except Exception as e:
+            logger.warning(f"Form schema garbage collection failed: {e}")
+
+def on_forms_changed(payload: str):
+    """Handle a forms_changed notification (payload is the client id)"""
+    try:
+        invalidate_published_forms(int(payload))
+    except ValueError:
+        logger.warning(f"Ignoring malformed forms_changed payload: {payload!r}")
 
 router = APIRouter(prefix="/api/forms", tags=["Forms"])
 
@@ -15,130 +78,126 @@ async def verify_auth(authorization: str = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing authorization header")
     
-    token = authorization.split(" ")[1]
-    token_data = get_token_data(token)
+    token_data = get_principal(authorization)
     
     if not token_data:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     return token_data
 
-@router.get("/client/{client_id}", response_model=List[models.FormResponse])
-async def get_client_forms(client_id: int, user: dict = Depends(verify_auth)):
-    """Get all forms for a specific client"""
+async def json_list_response(request: Request, page: PageParams, name: str, view: str, *args,
+                             cache: Optional[LRUCache] = None) -> Response:
+    """
+    Serve one page of a JSON list statement, honouring If-None-Match
+    
+    The ETag covers the page's row versions plus the view and limit, so a
+    matching request is answered from the version-only statement without
+    reading any JSONB payloads.
+    
+    With `cache`, first pages are kept keyed by (*args, view, limit). Cache
+    fills read from the primary so an invalidation is never followed by a
+    stale replica read being cached.
+    """
+    cache_key = (*args, view, page.limit) if cache is not None and page.cursor is None else None
+    page_row = cache.get(cache_key) if cache_key is not None else None
+    
+    if page_row is None:
+        if request.headers.get("if-none-match"):
+            version = await db.fetchval(version_statement(name), *args, *page.after(), page.limit, read_only=True)
+            etag = make_etag(name, view, page.limit, version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        
+        generation = cache.generation if cache_key is not None else None
+        page_row = await db.fetchrow(list_statement(name, view), *args, *page.after(), page.limit,
+            read_only=cache_key is None)
+        if cache_key is not None:
+            cache.put(cache_key, page_row, generation)
+    
+    etag = make_etag(name, view, page.limit, page_row['version'])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response = json_page_response(page_row, page)
+    set_etag(response, etag)
+    return response
+
+@router.get("/client/{client_id}", response_model=List[Union[models.FormResponse, models.FormSummaryResponse]], dependencies=[Depends(read_deadline)])
+async def get_client_forms(client_id: int, request: Request, view: ListView = Query("full"), page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """Get a page of forms for a specific client, newest first"""
     
     # Verify access (admin can see all, client can only see their own)
     if user['role'] != 'admin' and str(user['user_id']) != str(client_id):
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        forms = await db.fetch("""
-            SELECT id, client_id, title, data, status, is_template, created_at, updated_at
-            FROM forms
-            WHERE client_id = $1
-            ORDER BY created_at DESC
-        """, client_id)
-        
-        result = []
-        for row in forms:
-            # Handle JSONB data field - it might be a string or dict
-            data = row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-            
-            result.append({
-                "id": str(row['id']),
-                "client_id": row['client_id'],
-                "title": row['title'],
-                "data": data,
-                "status": row['status'],
-                "is_template": row['is_template'],
-                "created_at": row['created_at'].isoformat(),
-                "updated_at": row['updated_at'].isoformat()
-            })
-        
-        return result
+        # Response body is built in SQL; JSONB payloads are never parsed here
+        return await json_list_response(request, page, "forms.by_client", view, client_id)
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in get_client_forms: {e}")
+        logger.error(f"Error in get_client_forms: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/published/{client_id}", response_model=List[models.FormResponse])
-async def get_published_forms(client_id: int, user: dict = Depends(verify_auth)):
-    """Get published forms for a client (for client dashboard)"""
+@router.get("/published/{client_id}", response_model=List[Union[models.FormResponse, models.FormSummaryResponse]], dependencies=[Depends(read_deadline)])
+async def get_published_forms(client_id: int, request: Request, view: ListView = Query("full"), page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """Get a page of published forms for a client (for client dashboard)"""
     
     # Verify access
     if user['role'] != 'admin' and str(user['user_id']) != str(client_id):
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        forms = await db.fetch("""
-            SELECT id, client_id, title, data, status, is_template, created_at, updated_at
-            FROM forms
-            WHERE client_id = $1 AND status = 'published'
-            ORDER BY created_at DESC
-        """, client_id)
-        
-        result = []
-        for row in forms:
-            data = row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-            
-            result.append({
-                "id": str(row['id']),
-                "client_id": row['client_id'],
-                "title": row['title'],
-                "data": data,
-                "status": row['status'],
-                "is_template": row['is_template'],
-                "created_at": row['created_at'].isoformat(),
-                "updated_at": row['updated_at'].isoformat()
-            })
-        
-        return result
+        return await json_list_response(request, page, "forms.published_by_client", view, client_id,
+            cache=published_forms_cache)
+    except (HTTPException, QueryTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_published_forms: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/dashboard/{client_id}", response_model=List[models.DashboardFormResponse], dependencies=[Depends(read_deadline)])
+async def get_dashboard_forms(client_id: int, request: Request, include_drafts: bool = Query(False),
+                              page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """
+    Get a page of published forms for a client with their submission status
+    
+    Each form carries the client's latest submission id and time, and
+    submission_status 'completed' or 'pending', so the dashboard needs one
+    request instead of joining forms and submissions in the browser.
+    With include_drafts, draft forms are listed too (the admin's client view).
+    """
+    
+    # Verify access
+    if user['role'] != 'admin' and str(user['user_id']) != str(client_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    try:
+        name = "forms.dashboard_all" if include_drafts else "forms.dashboard"
+        return await json_list_response(request, page, name, "full", client_id)
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in get_published_forms: {e}")
+        logger.error(f"Error in get_dashboard_forms: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/templates", response_model=List[models.FormResponse])
-async def get_templates(user: dict = Depends(verify_auth)):
-    """Get all form templates"""
+@router.get("/templates", response_model=List[Union[models.FormResponse, models.FormSummaryResponse]], dependencies=[Depends(read_deadline)])
+async def get_templates(request: Request, view: ListView = Query("full"), page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """Get a page of form templates"""
     
     # Only admin can access templates
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        templates = await db.fetch("""
-            SELECT id, client_id, title, data, status, is_template, created_at, updated_at
-            FROM forms
-            WHERE is_template = true
-            ORDER BY created_at DESC
-        """)
-        
-        result = []
-        for row in templates:
-            data = row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-            
-            result.append({
-                "id": str(row['id']),
-                "client_id": row['client_id'],
-                "title": row['title'],
-                "data": data,
-                "status": row['status'],
-                "is_template": row['is_template'],
-                "created_at": row['created_at'].isoformat(),
-                "updated_at": row['updated_at'].isoformat()
-            })
-        
-        return result
+        return await json_list_response(request, page, "forms.templates", view)
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in get_templates: {e}")
+        logger.error(f"Error in get_templates: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("", response_model=models.FormResponse)
+@router.post("", response_model=models.FormResponse, dependencies=[Depends(write_deadline)])
 async def create_form(form: models.FormCreate, user: dict = Depends(verify_auth)):
     """Create a new form"""
     
@@ -147,40 +206,36 @@ async def create_form(form: models.FormCreate, user: dict = Depends(verify_auth)
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        # Verify client exists
-        client = await db.fetchval("SELECT id FROM clients WHERE id = $1", form.client_id)
-        if not client:
-            raise HTTPException(status_code=404, detail="Client not found")
-        
-        # Insert form
-        new_form = await db.fetchrow("""
-            INSERT INTO forms (client_id, title, data, status, is_template)
-            VALUES ($1, $2, $3, $4, $5)
-            RETURNING id, client_id, title, data, status, is_template, created_at, updated_at
-        """, form.client_id, form.title, json.dumps(form.data), form.status, form.is_template)
+        async with db.transaction() as tx:
+            # Verify client exists
+            client = await tx.fetchval("clients.exists", form.client_id)
+            if not client:
+                raise HTTPException(status_code=404, detail="Client not found")
+            
+            # Insert form
+            new_form = await tx.fetchrow(
+                "forms.insert", form.client_id, form.title, form.data, form.status, form.is_template
+            )
         
-        # Handle JSONB data field
-        data = new_form['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        invalidate_published_forms(new_form['client_id'])
         
         return {
             "id": str(new_form['id']),
             "client_id": new_form['client_id'],
             "title": new_form['title'],
-            "data": data,
+            "data": new_form['data'],
             "status": new_form['status'],
             "is_template": new_form['is_template'],
             "created_at": new_form['created_at'].isoformat(),
             "updated_at": new_form['updated_at'].isoformat()
         }
-    except HTTPException:
+    except (HTTPException, QueryTimeoutError):
         raise
     except Exception as e:
-        print(f"Error in create_form: {e}")
+        logger.error(f"Error in create_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.put("/{form_id}", response_model=models.FormResponse)
+@router.put("/{form_id}", response_model=models.FormResponse, dependencies=[Depends(write_deadline)])
 async def update_form(form_id: str, form_update: models.FormUpdate, user: dict = Depends(verify_auth)):
     """Update a form"""
     
@@ -188,71 +243,97 @@ async def update_form(form_id: str, form_update: models.FormUpdate, user: dict =
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Check if form exists
-    existing = await db.fetchrow("SELECT id FROM forms WHERE id = $1", form_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Form not found")
-    
-    # Build update query
-    update_fields = []
-    values = []
-    param_count = 1
-    
-    if form_update.title is not None:
-        update_fields.append(f"title = ${param_count}")
-        values.append(form_update.title)
-        param_count += 1
-    
-    if form_update.data is not None:
-        update_fields.append(f"data = ${param_count}")
-        values.append(json.dumps(form_update.data))
-        param_count += 1
-    
-    if form_update.status is not None:
-        update_fields.append(f"status = ${param_count}")
-        values.append(form_update.status)
-        param_count += 1
-    
-    if not update_fields:
+    if not form_update.model_dump(exclude_none=True):
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    # Add updated_at
-    update_fields.append(f"updated_at = NOW()")
-    
-    # Add form_id to values
-    values.append(form_id)
-    
     try:
-        # Update form
-        query = f"""
-            UPDATE forms
-            SET {', '.join(update_fields)}
-            WHERE id = ${param_count}
-            RETURNING id, client_id, title, data, status, is_template, created_at, updated_at
-        """
+        # Single prepared statement covers every combination of fields;
+        # no row back means the form does not exist
+        updated_form = await db.fetchrow(
+            "forms.update",
+            form_update.title,
+            form_update.data,
+            form_update.status,
+            form_id
+        )
         
-        updated_form = await db.fetchrow(query, *values)
+        if not updated_form:
+            raise HTTPException(status_code=404, detail="Form not found")
         
-        # Handle JSONB data field
-        data = updated_form['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        invalidate_published_forms(updated_form['client_id'])
         
         return {
             "id": str(updated_form['id']),
             "client_id": updated_form['client_id'],
             "title": updated_form['title'],
-            "data": data,
+            "data": updated_form['data'],
             "status": updated_form['status'],
             "is_template": updated_form['is_template'],
             "created_at": updated_form['created_at'].isoformat(),
             "updated_at": updated_form['updated_at'].isoformat()
         }
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in update_form: {e}")
+        logger.error(f"Error in update_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/{form_id}/publish", response_model=models.FormResponse)
+@router.patch("/{form_id}", response_model=models.FormPatchResponse, dependencies=[Depends(write_deadline)])
+async def patch_form(form_id: str, form_patch: models.FormPatch, user: dict = Depends(verify_auth)):
+    """
+    Apply an RFC 6902 JSON Patch to a form's title and data
+    
+    Operations address the document {"title": ..., "data": ...}, e.g.
+    /data/fields/3/label. `updated_at` must match the stored form, so a
+    patch built against an older version is rejected with 409 instead of
+    overwriting someone else's edit. Only the new version is returned,
+    for the next patch.
+    """
+    
+    # Only admin can patch forms
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    try:
+        async with db.transaction() as tx:
+            current = await tx.fetchrow("forms.lock_content", form_id)
+            if not current:
+                raise HTTPException(status_code=404, detail="Form not found")
+            # updated_at is stored as naive UTC; bring an offset timestamp to UTC first
+            expected = form_patch.updated_at
+            if expected.tzinfo is not None:
+                expected = expected.astimezone(timezone.utc).replace(tzinfo=None)
+            if current['updated_at'] != expected:
+                raise HTTPException(status_code=409, detail="Form was modified by someone else, please reload it")
+            
+            # The decoded row is ours, so patch it without copying
+            document = {"title": current['title'], "data": current['data']}
+            try:
+                patched = apply_patch(document, form_patch.operations, in_place=True)
+            except JsonPatchError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            
+            if not isinstance(patched, dict) or set(patched) != {"title", "data"}:
+                raise HTTPException(status_code=422, detail="Patch may only change /title and /data")
+            if not isinstance(patched['title'], str) or not patched['title'] or not isinstance(patched['data'], dict):
+                raise HTTPException(status_code=422, detail="Patched form needs a title and a data object")
+            
+            updated_form = await tx.fetchrow("forms.set_content", form_id, patched['title'], patched['data'])
+        
+        invalidate_published_forms(updated_form['client_id'])
+        
+        return {
+            "id": str(updated_form['id']),
+            "client_id": updated_form['client_id'],
+            "updated_at": updated_form['updated_at'].isoformat()
+        }
+    except (HTTPException, QueryTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error in patch_form: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{form_id}/publish", response_model=models.FormResponse, dependencies=[Depends(write_deadline)])
 async def publish_form(form_id: str, user: dict = Depends(verify_auth)):
     """Publish a form to client"""
     
@@ -262,36 +343,30 @@ async def publish_form(form_id: str, user: dict = Depends(verify_auth)):
     
     try:
         # Update form status to published
-        updated_form = await db.fetchrow("""
-            UPDATE forms
-            SET status = 'published', updated_at = CURRENT_TIMESTAMP
-            WHERE id = $1
-            RETURNING id, client_id, title, data, status, is_template, created_at, updated_at
-        """, form_id)
+        updated_form = await db.fetchrow("forms.set_status", form_id, 'published')
         
         if not updated_form:
             raise HTTPException(status_code=404, detail="Form not found")
         
-        # Handle JSONB data field
-        data = updated_form['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        invalidate_published_forms(updated_form['client_id'])
         
         return {
             "id": str(updated_form['id']),
             "client_id": updated_form['client_id'],
             "title": updated_form['title'],
-            "data": data,
+            "data": updated_form['data'],
             "status": updated_form['status'],
             "is_template": updated_form['is_template'],
             "created_at": updated_form['created_at'].isoformat(),
             "updated_at": updated_form['updated_at'].isoformat()
         }
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in publish_form: {e}")
+        logger.error(f"Error in publish_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/{form_id}/unpublish", response_model=models.FormResponse)
+@router.post("/{form_id}/unpublish", response_model=models.FormResponse, dependencies=[Depends(write_deadline)])
 async def unpublish_form(form_id: str, user: dict = Depends(verify_auth)):
     """Unpublish a form (revert to draft)"""
     
@@ -301,38 +376,30 @@ async def unpublish_form(form_id: str, user: dict = Depends(verify_auth)):
     
     try:
         # Update form status to draft
-        updated_form = await db.fetchrow("""
-            UPDATE forms
-            SET status = 'draft', updated_at = CURRENT_TIMESTAMP
-            WHERE id = $1
-            RETURNING id, client_id, title, data, status, is_template, created_at, updated_at
-        """, form_id)
+        updated_form = await db.fetchrow("forms.set_status", form_id, 'draft')
         
         if not updated_form:
             raise HTTPException(status_code=404, detail="Form not found")
         
-        # Handle JSONB data field
-        data = updated_form['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        invalidate_published_forms(updated_form['client_id'])
         
         return {
             "id": str(updated_form['id']),
             "client_id": updated_form['client_id'],
             "title": updated_form['title'],
-            "data": data,
+            "data": updated_form['data'],
             "status": updated_form['status'],
             "is_template": updated_form['is_template'],
             "created_at": updated_form['created_at'].isoformat(),
             "updated_at": updated_form['updated_at'].isoformat()
         }
-    except HTTPException:
+    except (HTTPException, QueryTimeoutError):
         raise
     except Exception as e:
-        print(f"Error in unpublish_form: {e}")
+        logger.error(f"Error in unpublish_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/{form_id}/copy", response_model=models.FormResponse)
+@router.post("/{form_id}/copy", response_model=models.FormResponse, dependencies=[Depends(write_deadline)])
 async def copy_form(form_id: str, client_id: int, user: dict = Depends(verify_auth)):
     """Copy a form as a template or to another client"""
     
@@ -341,43 +408,73 @@ async def copy_form(form_id: str, client_id: int, user: dict = Depends(verify_au
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        # Get original form
-        original = await db.fetchrow("""
-            SELECT title, data FROM forms WHERE id = $1
-        """, form_id)
-        
-        if not original:
+        # The copy references the original's stored definition; no row back
+        # means the original does not exist
+        new_form = await db.fetchrow("forms.copy", form_id, client_id)
+        if not new_form:
             raise HTTPException(status_code=404, detail="Form not found")
         
-        # Create copy
-        new_form = await db.fetchrow("""
-            INSERT INTO forms (client_id, title, data, status, is_template)
-            VALUES ($1, $2, $3, 'draft', false)
-            RETURNING id, client_id, title, data, status, is_template, created_at, updated_at
-        """, client_id, f"{original['title']} (Copy)", original['data'])
-        
-        # Handle JSONB data field
-        data = new_form['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        invalidate_published_forms(new_form['client_id'])
         
         return {
             "id": str(new_form['id']),
             "client_id": new_form['client_id'],
             "title": new_form['title'],
-            "data": data,
+            "data": new_form['data'],
             "status": new_form['status'],
             "is_template": new_form['is_template'],
             "created_at": new_form['created_at'].isoformat(),
             "updated_at": new_form['updated_at'].isoformat()
         }
-    except HTTPException:
+    except (HTTPException, QueryTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error in copy_form: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{form_id}/assign", response_model=models.FormAssignResponse, dependencies=[Depends(write_deadline)])
+async def assign_form(form_id: str, assignment: models.FormAssign, user: dict = Depends(verify_auth)):
+    """
+    Copy a form (typically a template) to many clients at once
+    
+    All copies are inserted by one INSERT ... SELECT, so rolling a template
+    out to every client costs a single round trip. Copies keep the source
+    title and are created as drafts unless `publish` is set.
+    """
+    
+    # Only admin can assign forms
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if assignment.all_clients == (assignment.client_ids is not None):
+        raise HTTPException(status_code=400, detail="Provide either client_ids or all_clients")
+    
+    status = 'published' if assignment.publish else 'draft'
+    
+    try:
+        async with db.transaction() as tx:
+            rows = await tx.fetch("forms.assign", form_id, assignment.client_ids, status)
+            
+            # An empty result is either an unknown form or no matching clients
+            if not rows and not await tx.fetchrow("forms.exists", form_id):
+                raise HTTPException(status_code=404, detail="Form not found")
+        
+        assigned = {row['client_id'] for row in rows}
+        invalidate_published_forms_for(assigned)
+        
+        return {
+            "form_id": form_id,
+            "status": status,
+            "assigned": len(rows),
+            "missing_client_ids": sorted(set(assignment.client_ids or []) - assigned)
+        }
+    except (HTTPException, QueryTimeoutError):
         raise
     except Exception as e:
-        print(f"Error in copy_form: {e}")
+        logger.error(f"Error in assign_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.delete("/{form_id}")
+@router.delete("/{form_id}", dependencies=[Depends(write_deadline)])
 async def delete_form(form_id: str, user: dict = Depends(verify_auth)):
     """Delete a form"""
     
@@ -385,18 +482,23 @@ async def delete_form(form_id: str, user: dict = Depends(verify_auth)):
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Check if form exists
-    existing = await db.fetchrow("SELECT id FROM forms WHERE id = $1", form_id)
-    if not existing:
-        raise HTTPException(status_code=404, detail="Form not found")
-    
-    # Delete form
-    await db.execute("DELETE FROM forms WHERE id = $1", form_id)
-    
-    return {"message": "Form deleted successfully"}
+    try:
+        # No row back means the form does not exist
+        deleted = await db.fetchrow("forms.delete", form_id)
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Form not found")
+        
+        invalidate_published_forms(deleted['client_id'])
+        
+        return {"message": "Form deleted successfully"}
+    except (HTTPException, QueryTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error in delete_form: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Submission endpoints
-@router.post("/submit", response_model=models.SubmissionResponse)
+@router.post("/submit", response_model=models.SubmissionResponse, dependencies=[Depends(write_deadline)])
 async def submit_form(submission: models.SubmissionCreate, user: dict = Depends(verify_auth)):
     """Submit a form (client side) - Creates new or updates existing submission"""
     
@@ -405,94 +507,123 @@ async def submit_form(submission: models.SubmissionCreate, user: dict = Depends(
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        # Verify form exists
-        form = await db.fetchrow("""
-            SELECT id, status FROM forms WHERE id = $1 AND client_id = $2
-        """, submission.form_id, submission.client_id)
+        # With this form's validator cached, valid data takes one round trip:
+        # the upsert verifies the form belongs to the client and is still at
+        # the version the validator was compiled from
+        result_submission = None
+        cached = cached_validator(submission.form_id)
+        if cached is not None and not cached[1](submission.data):
+            result_submission = await db.fetchrow(
+                "submissions.upsert", submission.client_id, submission.form_id, submission.data, cached[0]
+            )
         
-        if not form:
-            raise HTTPException(status_code=404, detail="Form not found")
-        
-        # Check if submission already exists
-        existing_submission = await db.fetchrow("""
-            SELECT id FROM submissions 
-            WHERE client_id = $1 AND form_id = $2
-        """, submission.client_id, submission.form_id)
-        
-        if existing_submission:
-            # UPDATE existing submission
-            updated_submission = await db.fetchrow("""
-                UPDATE submissions 
-                SET data = $1, submitted_at = CURRENT_TIMESTAMP
-                WHERE id = $2
-                RETURNING id, client_id, form_id, data, submitted_at
-            """, json.dumps(submission.data), existing_submission['id'])
+        if not result_submission:
+            form = await db.fetchrow("forms.validation_schema", submission.form_id)
+            if not form or form['client_id'] != submission.client_id:
+                raise HTTPException(status_code=404, detail="Form not found")
+            
+            if cached is not None and cached[0] == form['updated_at']:
+                validator = cached[1]
+            else:
+                validator = store_validator(submission.form_id, form['updated_at'], form['fields'] or [])
             
-            result_submission = updated_submission
-        else:
-            # INSERT new submission
-            new_submission = await db.fetchrow("""
-                INSERT INTO submissions (client_id, form_id, data)
-                VALUES ($1, $2, $3)
-                RETURNING id, client_id, form_id, data, submitted_at
-            """, submission.client_id, submission.form_id, json.dumps(submission.data))
+            errors = validator(submission.data)
+            if errors:
+                raise HTTPException(status_code=400, detail="Invalid submission: " + "; ".join(errors))
             
-            result_submission = new_submission
+            result_submission = await db.fetchrow(
+                "submissions.upsert", submission.client_id, submission.form_id, submission.data, form['updated_at']
+            )
+            if not result_submission:
+                raise HTTPException(status_code=409, detail="Form was changed while submitting, please reload it")
         
         # Note: We don't update form status here because the database constraint
         # only allows 'draft' and 'published'. Completion status is determined
-        # by checking if a submission exists in the submissions table.
-        
-        # Handle JSONB data field
-        data = result_submission['data']
-        if isinstance(data, str):
-            data = json.loads(data)
+        # by checking if a submission exists in the submissions table (see
+        # get_dashboard_forms).
         
         return {
             "id": str(result_submission['id']),
             "client_id": result_submission['client_id'],
             "form_id": str(result_submission['form_id']),
-            "data": data,
+            "data": result_submission['data'],
             "submitted_at": result_submission['submitted_at'].isoformat()
         }
-    except HTTPException:
+    except (HTTPException, QueryTimeoutError):
         raise
     except Exception as e:
-        print(f"Error in submit_form: {e}")
+        logger.error(f"Error in submit_form: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/submissions/client/{client_id}", response_model=List[models.SubmissionResponse])
-async def get_client_submissions(client_id: int, user: dict = Depends(verify_auth)):
-    """Get all submissions for a client"""
+@router.get("/submissions/client/{client_id}", response_model=List[models.SubmissionListResponse], dependencies=[Depends(read_deadline)])
+async def get_client_submissions(client_id: int, request: Request, page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """Get a page of submissions for a client, newest first"""
     
     # Verify access
     if user['role'] != 'admin' and str(user['user_id']) != str(client_id):
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        submissions = await db.fetch("""
-            SELECT id, client_id, form_id, data, submitted_at
-            FROM submissions
-            WHERE client_id = $1
-            ORDER BY submitted_at DESC
-        """, client_id)
+        return await json_list_response(request, page, "submissions.by_client", "full", client_id)
+    except (HTTPException, QueryTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_client_submissions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{form_id}/submission", response_model=Optional[models.SubmissionResponse], dependencies=[Depends(read_deadline)])
+async def get_form_submission(form_id: str, user: dict = Depends(verify_auth)):
+    """Get the submission for a form, or null if it has not been filled in yet"""
+    
+    try:
+        # Primary: the client re-opens the form right after submitting it
+        submission = await db.fetchrow("submissions.by_form", form_id)
+        if not submission:
+            raise HTTPException(status_code=404, detail="Form not found")
+        
+        # Verify access to the form before saying whether it was filled in
+        if user['role'] != 'admin' and str(user['user_id']) != str(submission['owner_id']):
+            raise HTTPException(status_code=403, detail="Access denied")
         
-        result = []
-        for row in submissions:
-            data = row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-                
-            result.append({
-                "id": str(row['id']),
-                "client_id": row['client_id'],
-                "form_id": str(row['form_id']),
-                "data": data,
-                "submitted_at": row['submitted_at'].isoformat()
-            })
+        if submission['id'] is None:
+            return None
         
-        return result
+        return {
+            "id": str(submission['id']),
+            "client_id": submission['client_id'],
+            "form_id": str(submission['form_id']),
+            "data": submission['data'],
+            "submitted_at": submission['submitted_at'].isoformat()
+        }
+    except (HTTPException, QueryTimeoutError):
+        raise
     except Exception as e:
-        print(f"Error in get_client_submissions: {e}")
+        logger.error(f"Error in get_form_submission: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{form_id}", response_model=models.FormResponse, dependencies=[Depends(read_deadline)])
+async def get_form(form_id: str, request: Request, user: dict = Depends(verify_auth)):
+    """Get a single form with its full definition"""
+    
+    # Read from the primary: the form builder re-opens a form right after
+    # saving it, and a lagging replica would serve the previous version
+    # Revalidation only needs the owner and version
+    if request.headers.get("if-none-match"):
+        version = await db.fetchrow("forms.version", form_id)
+        if version and (user['role'] == 'admin' or str(user['user_id']) == str(version['client_id'])):
+            etag = make_etag("form", form_id, version['updated_at'])
+            if etag_matches(request, etag):
+                return not_modified(etag)
+    
+    form = await db.fetchrow("forms.get_json", form_id)
+    
+    if not form:
+        raise HTTPException(status_code=404, detail="Form not found")
+    
+    # Verify access
+    if user['role'] != 'admin' and str(user['user_id']) != str(form['client_id']):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    response = raw_json_response(form['body'])
+    set_etag(response, make_etag("form", form_id, form['updated_at']))
+    return response
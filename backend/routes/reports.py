@@ -1,16 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-import json
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Set, Union
+import asyncio
+import logging
 import database as db_module
 import models
-from utils.report_generator import generate_report
-from routes.forms import verify_auth
+from config import settings
+from utils import deadline
+from utils.report_generator import generate_report, generate_reports
+from routes.forms import verify_auth, json_list_response
+from utils.deadline import read_deadline, report_deadline, write_deadline
+from utils.helpers import raw_json_response
+from utils.pagination import ListView, PageParams
+from utils.etag import etag_matches, make_etag, not_modified, set_etag
 
 db = db_module.db
+logger = logging.getLogger(__name__)
+
+# Batch jobs running in this worker, kept referenced until they finish
+report_job_tasks: Set[asyncio.Task] = set()
+
+# Keyset start for report_jobs.pending_submissions
+FIRST_SUBMISSION_ID = "00000000-0000-0000-0000-000000000000"
 
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
-@router.post("/generate", response_model=models.ReportResponse)
+@router.post("/generate", response_model=models.ReportResponse, dependencies=[Depends(report_deadline)])
 async def generate_report_from_submission(report_request: models.ReportCreate, user: dict = Depends(verify_auth)):
     """Generate a report from a submission"""
     
@@ -18,42 +32,33 @@ async def generate_report_from_submission(report_request: models.ReportCreate, u
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Get submission data
-    submission = await db.fetchrow("""
-        SELECT id, client_id, form_id, data
-        FROM submissions
-        WHERE id = $1
-    """, report_request.submission_id)
-    
-    if not submission:
-        raise HTTPException(status_code=404, detail="Submission not found")
-    
-    # Verify client_id matches
-    if submission['client_id'] != report_request.client_id:
-        raise HTTPException(status_code=400, detail="Client ID mismatch")
-    
-    # Get form data (for targets)
-    form = await db.fetchrow("""
-        SELECT data FROM forms WHERE id = $1
-    """, str(submission['form_id']))
-    
-    if not form:
-        raise HTTPException(status_code=404, detail="Form not found")
-    
-    # Generate report
-    report_data = generate_report(
-        form_data=form['data'],
-        submission_data=submission['data'],
-        period=report_request.period
-    )
-    
-    # Save report to database
-    new_report = await db.fetchrow("""
-        INSERT INTO reports (client_id, submission_id, generated_report_data, period)
-        VALUES ($1, $2, $3, $4)
-        RETURNING id, client_id, submission_id, generated_report_data, period, created_at
-    """, report_request.client_id, report_request.submission_id, 
-        json.dumps(report_data), report_request.period)
+    async with db.connection() as conn:
+        # Get submission data
+        submission = await conn.fetchrow("submissions.get", report_request.submission_id)
+        
+        if not submission:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        
+        # Verify client_id matches
+        if submission['client_id'] != report_request.client_id:
+            raise HTTPException(status_code=400, detail="Client ID mismatch")
+        
+        # Get form data (for targets)
+        form = await conn.fetchrow("forms.get_data", submission['form_id'])
+        
+        if not form:
+            raise HTTPException(status_code=404, detail="Form not found")
+        
+        # Generate report
+        report_data = generate_report(
+            form_data=form['data'],
+            submission_data=submission['data'],
+            period=report_request.period
+        )
+        
+        # Save report to database
+        new_report = await conn.fetchrow("reports.insert", report_request.client_id, report_request.submission_id,
+            report_data, report_request.period)
     
     return {
         "id": str(new_report['id']),
@@ -64,42 +69,145 @@ async def generate_report_from_submission(report_request: models.ReportCreate, u
         "created_at": new_report['created_at'].isoformat()
     }
 
-@router.get("/client/{client_id}", response_model=List[models.ReportResponse])
-async def get_client_reports(client_id: int, user: dict = Depends(verify_auth)):
-    """Get all reports for a client"""
+def report_job_response(job) -> dict:
+    """Serialize a report_jobs row"""
+    return {
+        "id": str(job['id']),
+        "period": job['period'],
+        "submitted_from": job['submitted_from'].isoformat(),
+        "submitted_to": job['submitted_to'].isoformat(),
+        "status": job['status'],
+        "total": job['total'],
+        "processed": job['processed'],
+        "error": job['error'],
+        "created_at": job['created_at'].isoformat(),
+        "updated_at": job['updated_at'].isoformat(),
+        "finished_at": job['finished_at'].isoformat() if job['finished_at'] else None
+    }
+
+async def run_report_job(job_id, period: str, submitted_from, submitted_to):
+    """
+    Generate reports for every pending submission of a job, chunk by chunk
+    
+    Each chunk is read, turned into reports with generate_reports (one
+    vectorized pass), then inserted with executemany together with the
+    progress update in one transaction. The job only ever holds one primary
+    connection, and returns it between chunks.
+    """
+    # Started from a request, but must not inherit its deadline
+    deadline.clear()
+    after = FIRST_SUBMISSION_ID
+    
+    try:
+        while True:
+            rows = await db.fetch("report_jobs.pending_submissions", period, submitted_from, submitted_to, after,
+                settings.REPORT_JOB_CHUNK_SIZE)
+            if not rows:
+                break
+            
+            reports = generate_reports([(row['form_data'], row['data']) for row in rows], period)
+            
+            async with db.transaction() as tx:
+                await tx.executemany("reports.insert", [
+                    (row['client_id'], row['id'], report, period) for row, report in zip(rows, reports)
+                ])
+                await tx.execute("report_jobs.progress", job_id, len(rows))
+            
+            after = rows[-1]['id']
+        
+        await db.execute("report_jobs.finish", job_id, 'completed', None)
+    except asyncio.CancelledError:
+        # Best effort; report_jobs.fail_stale catches the job otherwise
+        try:
+            await asyncio.shield(db.execute("report_jobs.finish", job_id, 'failed', "Cancelled"))
+        except Exception as e:
+            logger.warning(f"Could not mark report job {job_id} as cancelled: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Report job {job_id} failed: {e}")
+        try:
+            await db.execute("report_jobs.finish", job_id, 'failed', str(e))
+        except Exception as finish_error:
+            logger.warning(f"Could not mark report job {job_id} as failed: {finish_error}")
+
+def cancel_report_jobs():
+    """Cancel this worker's running report jobs (application shutdown)"""
+    for task in report_job_tasks:
+        task.cancel()
+
+@router.post("/jobs", response_model=models.ReportJobResponse, status_code=202, dependencies=[Depends(write_deadline)])
+async def start_report_job(job_request: models.ReportJobCreate, user: dict = Depends(verify_auth)):
+    """
+    Start generating reports for all clients' submissions in a date range
+    
+    Every submission made between submitted_from and submitted_to
+    (inclusive) that has no report for the period since it was last
+    submitted gets one. Only one job runs at a time; poll
+    GET /api/reports/jobs/{job_id} for progress.
+    """
+    
+    # Only admin can generate reports
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if job_request.period not in ('weekly', 'monthly'):
+        raise HTTPException(status_code=400, detail="Period must be 'weekly' or 'monthly'")
+    if job_request.submitted_from > job_request.submitted_to:
+        raise HTTPException(status_code=400, detail="submitted_from must not be after submitted_to")
+    
+    async with db.transaction() as tx:
+        await tx.execute("report_jobs.fail_stale", settings.REPORT_JOB_STALE_SECONDS)
+        # No row back means another job is still running
+        job = await tx.fetchrow("report_jobs.insert", job_request.period, job_request.submitted_from,
+            job_request.submitted_to)
+    
+    if not job:
+        raise HTTPException(status_code=409, detail="A report job is already running")
+    
+    task = asyncio.create_task(run_report_job(job['id'], job['period'], job['submitted_from'], job['submitted_to']))
+    report_job_tasks.add(task)
+    task.add_done_callback(report_job_tasks.discard)
+    
+    return report_job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=models.ReportJobResponse, dependencies=[Depends(read_deadline)])
+async def get_report_job(job_id: str, user: dict = Depends(verify_auth)):
+    """Get a report job's status and progress"""
+    
+    # Only admin can see report jobs
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db.fetchrow("report_jobs.get", job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    
+    return report_job_response(job)
+
+@router.get("/client/{client_id}", response_model=List[Union[models.ReportResponse, models.ReportSummaryResponse]], dependencies=[Depends(read_deadline)])
+async def get_client_reports(client_id: int, request: Request, view: ListView = Query("full"), page: PageParams = Depends(), user: dict = Depends(verify_auth)):
+    """Get a page of reports for a client, newest first"""
     
     # Verify access
     if user['role'] != 'admin' and str(user['user_id']) != str(client_id):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    reports = await db.fetch("""
-        SELECT id, client_id, submission_id, generated_report_data, period, created_at
-        FROM reports
-        WHERE client_id = $1
-        ORDER BY created_at DESC
-    """, client_id)
-    
-    return [
-        {
-            "id": str(row['id']),
-            "client_id": row['client_id'],
-            "submission_id": str(row['submission_id']),
-            "generated_report_data": row['generated_report_data'],
-            "period": row['period'],
-            "created_at": row['created_at'].isoformat()
-        }
-        for row in reports
-    ]
+    # Response body is built in SQL; report payloads are never parsed here
+    return await json_list_response(request, page, "reports.by_client", view, client_id)
 
-@router.get("/{report_id}", response_model=models.ReportResponse)
-async def get_report(report_id: str, user: dict = Depends(verify_auth)):
+@router.get("/{report_id}", response_model=models.ReportResponse, dependencies=[Depends(read_deadline)])
+async def get_report(report_id: str, request: Request, user: dict = Depends(verify_auth)):
     """Get a specific report"""
     
-    report = await db.fetchrow("""
-        SELECT id, client_id, submission_id, generated_report_data, period, created_at
-        FROM reports
-        WHERE id = $1
-    """, report_id)
+    # Reports never change after insert, so the id alone is the version;
+    # revalidation only needs the owner
+    etag = make_etag("report", report_id)
+    if etag_matches(request, etag):
+        owner = await db.fetchval("reports.owner", report_id, read_only=True)
+        if owner is not None and (user['role'] == 'admin' or str(user['user_id']) == str(owner)):
+            return not_modified(etag)
+    
+    report = await db.fetchrow("reports.get_json", report_id, read_only=True)
     
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -108,16 +216,11 @@ async def get_report(report_id: str, user: dict = Depends(verify_auth)):
     if user['role'] != 'admin' and str(user['user_id']) != str(report['client_id']):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return {
-        "id": str(report['id']),
-        "client_id": report['client_id'],
-        "submission_id": str(report['submission_id']),
-        "generated_report_data": report['generated_report_data'],
-        "period": report['period'],
-        "created_at": report['created_at'].isoformat()
-    }
+    response = raw_json_response(report['body'])
+    set_etag(response, etag)
+    return response
 
-@router.delete("/{report_id}")
+@router.delete("/{report_id}", dependencies=[Depends(write_deadline)])
 async def delete_report(report_id: str, user: dict = Depends(verify_auth)):
     """Delete a report"""
     
@@ -125,12 +228,8 @@ async def delete_report(report_id: str, user: dict = Depends(verify_auth)):
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Check if report exists
-    existing = await db.fetchrow("SELECT id FROM reports WHERE id = $1", report_id)
-    if not existing:
+    deleted = await db.fetchval("reports.delete", report_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    # Delete report
-    await db.execute("DELETE FROM reports WHERE id = $1", report_id)
-    
     return {"message": "Report deleted successfully"}
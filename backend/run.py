@@ -1,5 +1,9 @@
 """
 Simple script to run the FastAPI server
+
+Usage:
+    python run.py               # development server with auto-reload
+    python run.py --production  # WEB_CONCURRENCY workers on uvloop/httptools
 """
 import sys
 import os
@@ -9,4 +13,27 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+
+    if "--production" in sys.argv[1:]:
+        from config import settings
+
+        workers = settings.get_worker_count()
+        # Worker processes re-read settings; pin the resolved count so each
+        # one sizes its pool from the same share of DB_CONNECTION_BUDGET
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=settings.PORT,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            # X-Forwarded-For is resolved by utils.rate_limit.client_address
+            # from TRUSTED_PROXY_HOPS; uvicorn would take its leftmost,
+            # client-supplied entry
+            proxy_headers=False,
+            log_level=settings.LOG_LEVEL.lower()
+        )
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
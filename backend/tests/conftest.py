@@ -0,0 +1,14 @@
+"""
+Shared test setup
+
+Settings are read on import, so the required environment variables are set
+before any backend module is imported. None of the unit tests open a
+database connection.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://test@localhost/test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
@@ -0,0 +1,142 @@
+"""
+Database routing and slow-query tests against stub pools
+
+Set TEST_DATABASE_URL to a database loaded from schema.sql to also check
+that every registered statement prepares.
+"""
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+import database
+from database import PRIMARY, Database, DatabaseError, QueryTimeoutError, ReadReplica
+from queries import STATEMENTS
+
+
+class StubConnection:
+    def __init__(self, result=None, error=None, delay=0.0):
+        self.result = result
+        self.error = error
+        self.delay = delay
+        self.calls = []
+
+    async def fetchval(self, sql, *args, timeout=None):
+        self.calls.append(sql)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class StubPool:
+    def __init__(self, connection=None, acquire_error=None):
+        self.connection = connection
+        self.acquire_error = acquire_error
+        self.acquired = 0
+
+    async def acquire(self, timeout=None):
+        if self.acquire_error is not None:
+            raise self.acquire_error
+        self.acquired += 1
+        return self.connection
+
+    async def release(self, connection):
+        pass
+
+
+def make_db(replica_pool):
+    db = Database()
+    db.pool = StubPool(StubConnection("primary"))
+    db.replicas = [ReadReplica("replica_1", replica_pool)]
+    return db
+
+
+def test_reads_go_to_replica_and_writes_to_primary():
+    db = make_db(StubPool(StubConnection("replica")))
+    assert asyncio.run(db.fetchval("SELECT 1", read_only=True)) == "replica"
+    assert asyncio.run(db.fetchval("SELECT 1")) == "primary"
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionRefusedError("refused"),
+    asyncpg.CannotConnectNowError("starting up"),
+    asyncpg.InterfaceError("connection closed"),
+])
+def test_unreachable_replica_is_ejected_and_read_falls_back(error):
+    replica_pool = StubPool(acquire_error=error)
+    db = make_db(replica_pool)
+    assert asyncio.run(db.fetchval("SELECT 1", read_only=True)) == "primary"
+    assert not db.replicas[0].is_available()
+
+    # Ejected replicas are skipped until they are restored
+    assert asyncio.run(db.fetchval("SELECT 1", read_only=True)) == "primary"
+    db.replicas[0].restore()
+    replica_pool.acquire_error = None
+    replica_pool.connection = StubConnection("replica")
+    assert asyncio.run(db.fetchval("SELECT 1", read_only=True)) == "replica"
+
+
+def test_connection_lost_mid_query_ejects_replica():
+    db = make_db(StubPool(StubConnection(error=asyncpg.ConnectionDoesNotExistError("lost"))))
+    assert asyncio.run(db.fetchval("SELECT 1", read_only=True)) == "primary"
+    assert not db.replicas[0].is_available()
+
+
+@pytest.mark.parametrize("replica_pool", [
+    StubPool(StubConnection(error=asyncio.TimeoutError())),
+    StubPool(acquire_error=asyncio.TimeoutError()),
+])
+def test_replica_timeout_does_not_eject_or_retry(replica_pool):
+    db = make_db(replica_pool)
+    with pytest.raises(QueryTimeoutError):
+        asyncio.run(db.fetchval("SELECT 1", read_only=True))
+    assert db.replicas[0].is_available()
+    assert db.pool.acquired == 0
+
+
+def test_query_error_on_replica_is_not_retried():
+    db = make_db(StubPool(StubConnection(error=asyncpg.UndefinedTableError("no such table"))))
+    with pytest.raises(DatabaseError):
+        asyncio.run(db.fetchval("SELECT 1 FROM missing", read_only=True))
+    assert db.replicas[0].is_available()
+    assert db.pool.acquired == 0
+
+
+def test_only_successful_slow_statements_are_recorded(monkeypatch):
+    monkeypatch.setattr(database.settings, "SLOW_QUERY_MS", 10)
+    monkeypatch.setattr(database.settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0)
+    db = Database()
+
+    async def run():
+        await db._call(StubConnection("ok", delay=0.02), PRIMARY, "fetchval", "SELECT 1", ())
+        with pytest.raises(asyncpg.QueryCanceledError):
+            await db._call(StubConnection(error=asyncpg.QueryCanceledError("canceled"), delay=0.02),
+                           PRIMARY, "fetchval", "SELECT 2", ())
+        with pytest.raises(asyncio.TimeoutError):
+            await db._call(StubConnection(error=asyncio.TimeoutError(), delay=0.02),
+                           PRIMARY, "fetchval", "SELECT 3", ())
+        await db._call(StubConnection("ok"), PRIMARY, "fetchval", "SELECT 4", ())
+
+    asyncio.run(run())
+    assert [entry["sql"] for entry in db.slow_queries.snapshot()] == ["SELECT 1"]
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_every_statement_prepares():
+    async def prepare_all():
+        connection = await asyncpg.connect(os.environ["TEST_DATABASE_URL"])
+        failures = {}
+        try:
+            for name, sql in STATEMENTS.items():
+                try:
+                    await connection.prepare(sql)
+                except asyncpg.PostgresError as e:
+                    failures[name] = str(e)
+        finally:
+            await connection.close()
+        return failures
+
+    assert asyncio.run(prepare_all()) == {}
@@ -0,0 +1,84 @@
+import pytest
+
+from utils.form_validation import MAX_ERRORS, compile_validator
+
+FIELDS = [
+    {"id": "weight", "type": "number", "label": "Weight", "required": True},
+    {"id": "sessions", "type": "integer", "label": "Sessions"},
+    {"id": "day", "type": "date", "label": "Day"},
+    {"id": "consent", "type": "checkbox", "label": "Consent", "required": True},
+    {"id": "mood", "type": "dropdown", "label": "Mood", "options": ["good", "bad"]},
+    {"id": "notes", "type": "textarea", "label": "Notes"},
+    {
+        "id": "log", "type": "dynamic_table", "label": "Log",
+        "columns": [
+            {"label": "Exercise", "type": "text", "access": "admin"},
+            {"label": "Done", "type": "checkbox", "access": "client"},
+            {"label": "Reps", "type": "number", "access": "client"},
+            {"label": "Coach says", "type": "checkbox", "access": "admin"},
+        ],
+        "rows": [{"col_0": "Squat"}, {"col_0": "Press"}],
+    },
+]
+
+VALID = {
+    "weight": "72.5", "sessions": 3, "day": "2024-03-01", "consent": True, "mood": "good", "notes": "",
+    "log_row_count": 2,
+    "log_row_0_col_0": "Squat", "log_row_0_col_1": True, "log_row_0_col_2": "12", "log_row_0_col_3": "yes",
+    "log_row_1_col_0": "Press", "log_row_1_col_1": "false", "log_row_1_col_2": "", "log_row_1_col_3": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def validate():
+    return compile_validator(FIELDS)
+
+
+def test_valid_submission(validate):
+    assert validate(VALID) == []
+
+
+def test_optional_fields_may_be_left_out(validate):
+    assert validate({"weight": 70, "consent": True}) == []
+
+
+def test_required_fields(validate):
+    assert validate({}) == ["Weight is required", "Consent is required"]
+    assert validate({**VALID, "weight": ""}) == ["Weight is required"]
+    assert validate({**VALID, "consent": False}) == ["Consent must be checked"]
+
+
+@pytest.mark.parametrize("key, value, error", [
+    ("weight", "heavy", "Weight must be a number"),
+    ("weight", True, "Weight must be a number"),
+    ("weight", "nan", "Weight must be a finite number"),
+    ("sessions", 2.5, "Sessions must be a whole number"),
+    ("day", "01/03/2024", "Day must be a date (YYYY-MM-DD)"),
+    ("mood", "great", "Mood is not one of the available options"),
+    ("notes", 5, "Notes must be text"),
+    ("log_row_0_col_1", "yes", "Log / Done (row 1) must be true or false"),
+    ("log_row_0_col_2", "many", "Log / Reps (row 1) must be a number"),
+    ("log_row_count", 3, "Log row count must be between 0 and 2"),
+    ("log_row_count", True, "Log row count must be between 0 and 2"),
+    ("log_row_2_col_1", True, "Unknown field 'log_row_2_col_1'"),
+    ("extra", 1, "Unknown field 'extra'"),
+])
+def test_invalid_values(validate, key, value, error):
+    assert validate({**VALID, key: value}) == [error]
+
+
+def test_admin_cells_are_not_type_checked(validate):
+    # Admin-only cells echo the admin's text back, whatever the column type
+    assert validate({**VALID, "log_row_0_col_0": 7, "log_row_0_col_3": "n/a"}) == []
+    assert validate({**VALID, "log_row_0_col_3": ["yes"]}) == ["Log / Coach says (row 1) must be a single value"]
+
+
+def test_cells_beyond_submitted_row_count(validate):
+    assert validate({**VALID, "log_row_count": 1}) == [
+        f"Log / {label} (row 2) is beyond the submitted row count" for label in ("Exercise", "Done", "Reps", "Coach says")
+    ]
+
+
+def test_errors_are_capped():
+    validate = compile_validator([{"id": f"n{index}", "type": "number"} for index in range(MAX_ERRORS * 2)])
+    assert len(validate({f"n{index}": "x" for index in range(MAX_ERRORS * 2)})) == MAX_ERRORS
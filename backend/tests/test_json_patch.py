@@ -0,0 +1,89 @@
+import pytest
+
+from utils.json_patch import JsonPatchError, apply_patch
+
+
+def form():
+    return {"title": "Check-in", "fields": [{"id": "a"}, {"id": "b"}], "meta": {"a/b": 1, "m~n": 2}}
+
+
+def test_add_replace_remove():
+    document = apply_patch(form(), [
+        {"op": "add", "path": "/fields/1", "value": {"id": "x"}},
+        {"op": "add", "path": "/fields/-", "value": {"id": "z"}},
+        {"op": "replace", "path": "/title", "value": "Weekly"},
+        {"op": "remove", "path": "/fields/0"},
+    ])
+    assert document["title"] == "Weekly"
+    assert [field["id"] for field in document["fields"]] == ["x", "b", "z"]
+
+
+def test_escaped_pointer_tokens():
+    document = apply_patch(form(), [
+        {"op": "replace", "path": "/meta/a~1b", "value": 10},
+        {"op": "remove", "path": "/meta/m~0n"},
+    ])
+    assert document["meta"] == {"a/b": 10}
+
+
+def test_move_and_copy():
+    document = apply_patch(form(), [
+        {"op": "copy", "from": "/fields/0", "path": "/fields/-"},
+        {"op": "move", "from": "/title", "path": "/name"},
+    ])
+    assert document["name"] == "Check-in" and "title" not in document
+    assert document["fields"][-1] == {"id": "a"}
+    document["fields"][-1]["id"] = "changed"
+    assert document["fields"][0] == {"id": "a"}
+
+
+def test_move_into_own_child_is_rejected():
+    with pytest.raises(JsonPatchError):
+        apply_patch(form(), [{"op": "move", "from": "/meta", "path": "/meta/inner"}])
+
+
+def test_failed_patch_leaves_document_untouched():
+    original = form()
+    with pytest.raises(JsonPatchError):
+        apply_patch(original, [
+            {"op": "replace", "path": "/title", "value": "Changed"},
+            {"op": "remove", "path": "/missing"},
+        ])
+    assert original == form()
+
+
+@pytest.mark.parametrize("path, value", [
+    ("/title", "Check-in"),
+    ("/fields/0", {"id": "a"}),
+    ("/meta/a~1b", 1.0),
+])
+def test_test_operation_passes(path, value):
+    assert apply_patch(form(), [{"op": "test", "path": path, "value": value}]) == form()
+
+
+@pytest.mark.parametrize("path, value", [
+    ("/meta/a~1b", True),
+    ("/meta/a~1b", "1"),
+    ("/title", "check-in"),
+    ("/fields", [{"id": "a"}]),
+    ("/fields/0", {"id": "a", "extra": None}),
+])
+def test_test_operation_compares_json_types(path, value):
+    with pytest.raises(JsonPatchError):
+        apply_patch(form(), [{"op": "test", "path": path, "value": value}])
+
+
+@pytest.mark.parametrize("operation", [
+    {"op": "replace", "path": "title", "value": 1},
+    {"op": "add", "path": "/fields/5", "value": 1},
+    {"op": "add", "path": "/fields/01", "value": 1},
+    {"op": "replace", "path": "/fields/-", "value": 1},
+    {"op": "replace", "path": "/missing", "value": 1},
+    {"op": "add", "path": "/title"},
+    {"op": "remove", "path": ""},
+    {"op": "frobnicate", "path": "/title"},
+    "not an object",
+])
+def test_invalid_operations_are_rejected(operation):
+    with pytest.raises(JsonPatchError):
+        apply_patch(form(), [operation])
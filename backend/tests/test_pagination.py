@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from utils.pagination import (
+    FIRST_PAGE_INT, FIRST_PAGE_TIMESTAMP, FIRST_PAGE_UUID, PageParams, decode_cursor, encode_cursor, int_id,
+    uuid_id
+)
+
+ROW_UUID = "3f2504e0-4f89-11d3-9a0c-0305e82c3301"
+
+
+def raw_cursor(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def test_uuid_cursor_round_trips():
+    sort_value = datetime(2024, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(sort_value, ROW_UUID)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (sort_value, ROW_UUID)
+
+
+def test_int_cursor_round_trips():
+    sort_value = datetime(2024, 3, 1)
+    assert decode_cursor(encode_cursor(sort_value, 42), int_id) == (sort_value, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "zzzz",
+    "not base64 !",
+    raw_cursor("2024-03-01T00:00:00"),
+    raw_cursor(f"yesterday|{ROW_UUID}"),
+    raw_cursor("2024-03-01T00:00:00|not-a-uuid"),
+    base64.urlsafe_b64encode(b"\xff\xfe|x").decode(),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.parametrize("row_id", ["-1", str(FIRST_PAGE_INT + 1), "1.5", "abc"])
+def test_int_cursor_rejects_out_of_range_ids(row_id):
+    with pytest.raises(HTTPException):
+        decode_cursor(raw_cursor(f"2024-03-01T00:00:00|{row_id}"), int_id)
+
+
+def test_uuid_id_normalises_case():
+    assert uuid_id(ROW_UUID.upper()) == ROW_UUID
+
+
+def test_first_page_uses_sentinel_key():
+    page = PageParams(limit=10, cursor=None)
+    assert page.after() == (FIRST_PAGE_TIMESTAMP, FIRST_PAGE_UUID)
+    assert page.after(int_id, FIRST_PAGE_INT) == (FIRST_PAGE_TIMESTAMP, FIRST_PAGE_INT)
+
+
+def test_later_page_continues_after_cursor():
+    sort_value = datetime(2024, 3, 1, 8)
+    page = PageParams(limit=10, cursor=encode_cursor(sort_value, 7))
+    assert page.after(int_id, FIRST_PAGE_INT) == (sort_value, 7)
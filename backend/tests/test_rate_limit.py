@@ -0,0 +1,71 @@
+import pytest
+from starlette.requests import Request
+
+from utils import rate_limit
+from utils.rate_limit import FailureLockout, TokenBucketLimiter, client_address
+
+
+def test_token_bucket_allows_burst_then_refills():
+    limiter = TokenBucketLimiter(rate=0.5, burst=2, max_keys=10)
+    assert limiter.acquire("ip", now=0) == 0
+    assert limiter.acquire("ip", now=0) == 0
+    assert limiter.acquire("ip", now=0) == pytest.approx(2.0)
+    assert limiter.acquire("ip", now=1) == pytest.approx(1.0)
+    assert limiter.acquire("ip", now=3) == 0
+    assert limiter.acquire("other", now=3) == 0
+
+
+def test_token_bucket_evicts_least_recently_used():
+    limiter = TokenBucketLimiter(rate=0.001, burst=1, max_keys=2)
+    limiter.acquire("a", now=0)
+    limiter.acquire("b", now=0)
+    limiter.acquire("a", now=0)
+    limiter.acquire("c", now=0)
+    assert list(limiter._buckets) == ["a", "c"]
+    # An evicted key starts again with a full bucket
+    assert limiter.acquire("b", now=0) == 0
+
+
+def test_lockout_after_failures_within_window():
+    lockout = FailureLockout(max_failures=3, window=60, lockout=300, max_keys=10)
+    for now in (0, 10, 20):
+        assert lockout.retry_after("e", now=now) == 0
+        lockout.record_failure("e", now=now)
+    assert lockout.retry_after("e", now=20) == pytest.approx(300)
+    assert lockout.retry_after("e", now=319) == pytest.approx(1)
+    assert lockout.retry_after("e", now=320) == 0
+
+
+def test_lockout_ignores_failures_outside_window():
+    lockout = FailureLockout(max_failures=3, window=60, lockout=300, max_keys=10)
+    for now in (0, 50, 100):
+        lockout.record_failure("e", now=now)
+    assert lockout.retry_after("e", now=100) == 0
+
+
+def test_lockout_reset_clears_failures():
+    lockout = FailureLockout(max_failures=2, window=60, lockout=300, max_keys=10)
+    lockout.record_failure("e", now=0)
+    lockout.reset("e")
+    lockout.record_failure("e", now=1)
+    assert lockout.retry_after("e", now=1) == 0
+
+
+def request(forwarded_for=None, peer="10.0.0.1"):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for is not None else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+@pytest.mark.parametrize("hops, forwarded_for, expected", [
+    (0, "203.0.113.9", "10.0.0.1"),
+    (1, None, "10.0.0.1"),
+    (1, "203.0.113.9", "203.0.113.9"),
+    # A client-supplied entry on the left must not pick the bucket
+    (1, "1.2.3.4, 203.0.113.9", "203.0.113.9"),
+    (2, "1.2.3.4, 203.0.113.9, 198.51.100.7", "203.0.113.9"),
+    (2, "198.51.100.7", "10.0.0.1"),
+    (1, " , ", "10.0.0.1"),
+])
+def test_client_address_uses_trusted_hop(monkeypatch, hops, forwarded_for, expected):
+    monkeypatch.setattr(rate_limit.settings, "TRUSTED_PROXY_HOPS", hops)
+    assert client_address(request(forwarded_for)) == expected
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils import auth
+from utils.auth import RevocationList, revocation_cutoff
+
+SUBJECT = "client:7"
+
+
+def at(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def row(row_id, revoked_at, jti=None, subject=None, issued_before=None, expires_at=None):
+    return {
+        "id": row_id, "jti": jti, "subject": subject, "issued_before": issued_before,
+        "revoked_at": revoked_at, "expires_at": expires_at or at(time.time() + 3600),
+    }
+
+
+def token(issued_at, jti="t1"):
+    return {"role": "client", "user_id": 7, "jti": jti, "issued_at": issued_at}
+
+
+def test_cutoff_is_next_whole_second(monkeypatch):
+    monkeypatch.setattr(auth.time, "time", lambda: 1000.25)
+    assert revocation_cutoff() == at(1001)
+    monkeypatch.setattr(auth.time, "time", lambda: 1000.0)
+    assert revocation_cutoff() == at(1001)
+
+
+def test_subject_cutoff_revokes_tokens_issued_up_to_this_second(monkeypatch):
+    monkeypatch.setattr(auth.time, "time", lambda: 1000.75)
+    revocations = RevocationList()
+    revocations.apply([row(1, at(1000.75), subject=SUBJECT, issued_before=revocation_cutoff())])
+    assert revocations.is_revoked(token(999))
+    # Issued earlier in the same second, or later in it after the revoke
+    assert revocations.is_revoked(token(1000))
+    assert not revocations.is_revoked(token(1001))
+    assert not revocations.is_revoked({**token(900), "user_id": 8})
+
+
+def test_later_cutoff_wins_regardless_of_order():
+    revocations = RevocationList()
+    revocations.apply([
+        row(2, at(2000), subject=SUBJECT, issued_before=at(2000)),
+        row(1, at(1000), subject=SUBJECT, issued_before=at(1000)),
+    ])
+    assert revocations.is_revoked(token(1500))
+
+
+def test_jti_revocation():
+    revocations = RevocationList()
+    revocations.apply([row(1, at(1000), jti="t1")])
+    assert revocations.is_revoked(token(5000, jti="t1"))
+    assert not revocations.is_revoked(token(5000, jti="t2"))
+
+
+def test_overlapping_window_rereads_are_deduplicated():
+    revocations = RevocationList()
+    assert revocations.window_start(60) == at(0)
+    revocations.apply([row(1, at(1000), jti="t1"), row(2, at(1030), jti="t2")])
+    assert revocations.last_seen == at(1030)
+    assert revocations.window_start(60) == at(970)
+
+    # A row committed late with an older revoked_at still lands in the window
+    revocations.apply([row(2, at(1030), jti="t2"), row(3, at(1010), jti="t3")])
+    assert revocations.last_seen == at(1030)
+    assert set(revocations.tokens) == {"t1", "t2", "t3"}
+
+    revocations.apply([row(4, at(1100), jti="t4")])
+    revocations.forget_seen(60)
+    assert set(revocations.seen) == {4}
+
+
+def test_reload_reads_from_the_start():
+    revocations = RevocationList()
+    revocations.apply([row(1, at(1000), jti="t1")])
+    revocations.reload()
+    assert revocations.window_start(60) == at(0)
+
+
+def test_prune_drops_expired_entries():
+    now = time.time()
+    revocations = RevocationList()
+    revocations.apply([
+        row(1, at(now - 10), jti="old", expires_at=at(now - 1)),
+        row(2, at(now - 10), jti="live", expires_at=at(now + 60)),
+        row(3, at(now - 10), subject=SUBJECT, issued_before=at(now), expires_at=at(now - 1)),
+    ])
+    revocations.prune()
+    assert set(revocations.tokens) == {"live"}
+    assert revocations.subjects == {}
+    assert revocations.last_seen == at(now - 10) and revocations.window_start(0) == at(now) - timedelta(seconds=10)
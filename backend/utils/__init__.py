@@ -1,11 +1,14 @@
 # Utils package initialization
-from .password import hash_password, verify_password
-from .auth import create_access_token, verify_token, get_token_data
+from .password import hash_password, verify_password, hash_password_async, verify_password_async
+from .auth import create_access_token, verify_token, get_token_data, get_principal
 
 __all__ = [
     'hash_password',
     'verify_password',
+    'hash_password_async',
+    'verify_password_async',
     'create_access_token',
     'verify_token',
-    'get_token_data'
+    'get_token_data',
+    'get_principal'
 ]
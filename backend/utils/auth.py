@@ -1,12 +1,148 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, Tuple
 from jose import JWTError, jwt
+import hashlib
 import logging
+import time
+import uuid
 import config as config_module
+from metrics import registry
 
 settings = config_module.settings
 logger = logging.getLogger(__name__)
 
+TOKEN_CACHE_LOOKUPS = registry.counter(
+    "auth_token_cache_lookups_total", "Verified-token cache lookups by result", ["result"]
+)
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified token data, keyed by token digest
+    
+    Entries expire at the token's own `exp`, so a cached token is never
+    accepted after it would have failed verification.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
+    
+    @staticmethod
+    def key(token: str) -> bytes:
+        """Digest used as cache key so raw tokens are not kept in memory"""
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Return cached token data, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, token_data = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return token_data
+    
+    def put(self, key: bytes, expires_at: float, token_data: Dict):
+        """Cache token data until `expires_at` (epoch seconds)"""
+        self._entries[key] = (expires_at, token_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached tokens"""
+        self._entries.clear()
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+class RevocationList:
+    """
+    In-memory snapshot of the token_revocations table
+    
+    Each worker re-reads the rows revoked since shortly before the newest one
+    it has seen and checks tokens against plain dicts, so revocation costs no
+    database round trip per request. Ids come from a sequence at insert time,
+    not commit time, so a cursor on id could skip a row committed late; the
+    overlapping window is deduplicated by id instead. Entries are dropped once
+    the tokens they cover have expired.
+    """
+    
+    def __init__(self):
+        # Newest revoked_at applied; None until the first (or a full) load
+        self.last_seen: Optional[datetime] = None
+        # Applied row id -> revoked_at, kept while inside the re-read window
+        self.seen: Dict[int, datetime] = {}
+        # jti -> expiry (epoch seconds)
+        self.tokens: Dict[str, float] = {}
+        # "role:user_id" -> (tokens issued before this second are revoked, expiry)
+        self.subjects: Dict[str, Tuple[float, float]] = {}
+    
+    def window_start(self, overlap_seconds: float) -> datetime:
+        """Earliest revoked_at the next sync has to read"""
+        if self.last_seen is None:
+            return datetime.fromtimestamp(0, tz=timezone.utc)
+        return self.last_seen - timedelta(seconds=overlap_seconds)
+    
+    def reload(self):
+        """Make the next sync read every live row again"""
+        self.last_seen = None
+    
+    def apply(self, rows: Iterable):
+        """Apply token_revocations rows, skipping ids already applied"""
+        for row in rows:
+            if row['id'] in self.seen:
+                continue
+            self.seen[row['id']] = row['revoked_at']
+            expires_at = row['expires_at'].timestamp()
+            if row['jti'] is not None:
+                self.tokens[row['jti']] = expires_at
+            else:
+                issued_before = row['issued_before'].timestamp()
+                current = self.subjects.get(row['subject'])
+                if current is None or current[0] < issued_before:
+                    self.subjects[row['subject']] = (issued_before, expires_at)
+            if self.last_seen is None or row['revoked_at'] > self.last_seen:
+                self.last_seen = row['revoked_at']
+    
+    def forget_seen(self, overlap_seconds: float):
+        """Drop remembered ids too old to be read again"""
+        if self.last_seen is not None:
+            start = self.window_start(overlap_seconds)
+            self.seen = {row_id: at for row_id, at in self.seen.items() if at >= start}
+    
+    def prune(self):
+        """Drop entries whose tokens can no longer pass verification"""
+        now = time.time()
+        self.tokens = {jti: exp for jti, exp in self.tokens.items() if exp > now}
+        self.subjects = {key: entry for key, entry in self.subjects.items() if entry[1] > now}
+    
+    def is_revoked(self, token_data: Dict) -> bool:
+        """Check a token's jti and issue time against the snapshot"""
+        if token_data.get("jti") in self.tokens:
+            return True
+        entry = self.subjects.get(f"{token_data['role']}:{token_data['user_id']}")
+        # iat is whole seconds; compare it against the cutoff in the same unit
+        return entry is not None and int(token_data.get("issued_at") or 0) < int(entry[0])
+
+def revocation_cutoff() -> datetime:
+    """
+    Cutoff for revoking every token a subject holds now
+    
+    Tokens carry whole-second `iat` from this process's clock, and every
+    token issued up to now has an iat of at most the current second, so the
+    cutoff is the start of the next second compared with a strict `<`.
+    Tokens issued in the remainder of the current second are revoked too.
+    
+    Returns:
+        Aware UTC datetime on a whole second
+    """
+    return datetime.fromtimestamp(int(time.time()) + 1, tz=timezone.utc)
+
+revocations = RevocationList()
+
 def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -25,7 +161,11 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({
+        "exp": expire,
+        "iat": datetime.now(timezone.utc),
+        "jti": uuid.uuid4().hex
+    })
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     
     logger.debug(f"Created access token for user: {data.get('email')}")
@@ -52,17 +192,58 @@ def get_token_data(token: str) -> Optional[Dict]:
     """
     Extract user data from token
     
+    Verified tokens are cached until they expire, so repeat requests with
+    the same token skip signature verification and claim parsing. Revoked
+    tokens are rejected whether they come from the cache or not.
+    
     Args:
         token: JWT token string
         
     Returns:
-        Dict with user_id, role, and email or None if invalid
+        Dict with user_id, role, email, jti, issued_at and expires_at, or
+        None if invalid or revoked
     """
+    key = TokenCache.key(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        TOKEN_CACHE_LOOKUPS.inc("hit")
+        if revocations.is_revoked(cached):
+            return None
+        return dict(cached)
+    TOKEN_CACHE_LOOKUPS.inc("miss")
+    
     payload = verify_token(token)
     if payload is None:
         return None
-    return {
+    
+    token_data = {
         "user_id": payload.get("sub"),
         "role": payload.get("role"),
-        "email": payload.get("email")
+        "email": payload.get("email"),
+        "jti": payload.get("jti"),
+        "issued_at": payload.get("iat"),
+        "expires_at": payload.get("exp")
     }
+    if payload.get("exp") is not None:
+        token_cache.put(key, float(payload["exp"]), token_data)
+    if revocations.is_revoked(token_data):
+        return None
+    return dict(token_data)
+
+def get_principal(authorization: Optional[str]) -> Optional[Dict]:
+    """
+    Resolve the caller from an Authorization header
+    
+    Shared by every auth dependency so all of them go through the
+    verified-token cache.
+    
+    Args:
+        authorization: Raw Authorization header value
+        
+    Returns:
+        Token data dict, or None if the header is missing, malformed or
+        carries an invalid token
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    return get_token_data(authorization[len("Bearer "):])
@@ -0,0 +1,73 @@
+"""
+Bounded in-process caches
+
+`LRUCache` evicts the least recently used entry beyond `max_size` and
+expires entries after `ttl` seconds as a safety net behind explicit
+invalidation. Every cache reports hits, misses and size under its name in
+`/api/metrics`. Everything runs on the event loop, so no locking is needed.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+from metrics import registry
+
+CACHE_LOOKUPS = registry.counter("cache_lookups_total", "In-process cache lookups by result", ["cache", "result"])
+CACHE_ENTRIES = registry.gauge("cache_entries", "Entries held by in-process caches", ["cache"])
+
+
+class LRUCache:
+    """
+    Bounded LRU cache with a time-to-live
+
+    `generation` increases on every invalidation. A caller that loads a
+    value from the database reads it first and passes it to `put`, so a
+    value read before a concurrent invalidation is never stored.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        registry.add_collector(lambda: CACHE_ENTRIES.set(len(self._entries), self.name))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._entries.move_to_end(key)
+            CACHE_LOOKUPS.inc(self.name, "hit")
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        CACHE_LOOKUPS.inc(self.name, "miss")
+        return None
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache (not None)
+            generation: `generation` observed before the value was loaded;
+                the value is dropped if the cache was invalidated since
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]):
+        """Drop every entry whose key matches `predicate`"""
+        self.generation += 1
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def clear(self):
+        """Drop all entries"""
+        self.generation += 1
+        self._entries.clear()
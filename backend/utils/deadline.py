@@ -0,0 +1,125 @@
+"""
+Request deadlines for database work
+
+A route dependency sets a per-request deadline; `Database` passes the
+remaining budget to every pool acquire and asyncpg call as its timeout, so a
+slow statement is cancelled on the server instead of holding a pool slot
+until `command_timeout`. `CancelOnDisconnectMiddleware` cancels the handler
+(and with it any running statement) when the client goes away.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+import config as config_module
+
+settings = config_module.settings
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current request's deadline
+
+    Returns:
+        Remaining seconds (may be zero or negative), or None when the
+        current request has no deadline
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def clear():
+    """
+    Drop the deadline in the current context
+
+    For background tasks started from a request, which inherit its context
+    but must outlive its budget.
+    """
+    _deadline.set(None)
+
+
+def request_deadline(seconds: float) -> Callable:
+    """
+    Build a route dependency that gives the request a time budget
+
+    Args:
+        seconds: Budget for all database work in the request
+
+    Returns:
+        Async dependency for use in `dependencies=[Depends(...)]`
+    """
+    async def set_request_deadline():
+        _deadline.set(time.monotonic() + seconds)
+
+    return set_request_deadline
+
+
+# Standard budgets
+read_deadline = request_deadline(settings.READ_DEADLINE_SECONDS)
+write_deadline = request_deadline(settings.WRITE_DEADLINE_SECONDS)
+report_deadline = request_deadline(settings.REPORT_DEADLINE_SECONDS)
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    ASGI middleware that cancels a request's handler when the client disconnects
+
+    The middleware reads the receive channel itself and feeds it to the app
+    through a queue, so it sees `http.disconnect` even when the app has
+    already read the body and is waiting on the database.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = False
+        response_complete = False
+
+        async def receive_wrapper():
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+
+        async def pump():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    # The server also reports disconnect once the response is
+                    # finished; only a premature one cancels the handler
+                    if not response_complete and not app_task.done():
+                        app_task.cancel()
+                    return
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not app_task.done():
+                # This request task itself was cancelled (e.g. shutdown)
+                app_task.cancel()
+                raise
+            if not app_task.cancelled():
+                raise
+        finally:
+            pump_task.cancel()
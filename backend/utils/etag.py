@@ -0,0 +1,43 @@
+"""
+Conditional GET support
+
+Handlers derive a strong ETag from a resource's version (id plus
+updated_at, or a digest of a list page's row versions). When the request's
+If-None-Match already matches, they answer 304 after a version-only query
+instead of fetching and sending the body.
+"""
+import hashlib
+from fastapi import Request, Response
+
+# Responses are per-user and must be revalidated on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the parts that identify a representation"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str):
+    """Attach the ETag and revalidation headers to a response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match"""
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,244 @@
+"""
+Submission validation against a form's field definitions
+
+`compile_validator` turns a form's `data.fields` into a function that checks
+a submission's flat `data` dict in one pass over its keys. Every accepted
+key, including each dynamic_table cell (`<field>_row_<r>_col_<c>`), is
+resolved to its checker up front, so validating a large table costs one
+dict lookup per cell. Compiled validators are cached per form and reused
+for as long as the form's `updated_at` is unchanged.
+"""
+import math
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import settings
+from utils.cache import LRUCache
+
+# Returns an error message, or None when the value is acceptable
+Check = Callable[[Any], Optional[str]]
+Validator = Callable[[dict], List[str]]
+
+# Errors reported back to the client; validation stops collecting beyond this
+MAX_ERRORS = 20
+
+# form_id -> (updated_at, validator)
+validator_cache = LRUCache(
+    "form_validators", settings.FORM_VALIDATOR_CACHE_SIZE, settings.FORM_VALIDATOR_CACHE_TTL_SECONDS
+)
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _check_text(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return "must be text"
+    return None
+
+
+def _check_number(value: Any) -> Optional[str]:
+    if isinstance(value, bool):
+        return "must be a number"
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return "must be a number"
+    else:
+        return "must be a number"
+    if not math.isfinite(number):
+        return "must be a finite number"
+    return None
+
+
+def _check_integer(value: Any) -> Optional[str]:
+    error = _check_number(value)
+    if error is None and not float(value).is_integer():
+        return "must be a whole number"
+    return error
+
+
+def _check_date(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return "must be a date"
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return "must be a date (YYYY-MM-DD)"
+    return None
+
+
+def _check_checkbox(value: Any) -> Optional[str]:
+    if not isinstance(value, bool):
+        return "must be true or false"
+    return None
+
+
+def _check_cell_checkbox(value: Any) -> Optional[str]:
+    # Cell values saved in the form definition are the strings "true"/"false"
+    if isinstance(value, bool) or value in ("true", "false"):
+        return None
+    return "must be true or false"
+
+
+def _check_admin_cell(value: Any) -> Optional[str]:
+    # Admin-only cells echo whatever the admin typed into the form definition
+    # back from hidden inputs, so only their shape is checked
+    if isinstance(value, (str, int, float, bool)):
+        return None
+    return "must be a single value"
+
+
+def _dropdown_check(options: List[Any]) -> Check:
+    allowed = frozenset(str(option) for option in options)
+
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, str) or (allowed and value not in allowed):
+            return "is not one of the available options"
+        return None
+    return check
+
+
+FIELD_CHECKS: Dict[str, Check] = {
+    "text": _check_text,
+    "textarea": _check_text,
+    "number": _check_number,
+    "integer": _check_integer,
+    "date": _check_date,
+    "checkbox": _check_checkbox,
+}
+
+CELL_CHECKS: Dict[str, Check] = {
+    "text": _check_text,
+    "number": _check_number,
+    "checkbox": _check_cell_checkbox,
+}
+
+
+def _optional(check: Check) -> Check:
+    """Accept blank values (an unanswered, non-required input)"""
+    def optional_check(value: Any) -> Optional[str]:
+        return None if _is_blank(value) else check(value)
+    return optional_check
+
+
+def compile_validator(fields: List[dict]) -> Validator:
+    """
+    Compile a form's field definitions into a submission validator
+
+    Args:
+        fields: The form's `data.fields` list
+
+    Returns:
+        Function taking a submission's `data` and returning a list of error
+        messages (empty when the submission is valid)
+    """
+    # key -> (label, check)
+    scalar_checks: Dict[str, Tuple[str, Check]] = {}
+    # cell key -> (label, row_count key, row index, check)
+    cell_checks: Dict[str, Tuple[str, str, int, Check]] = {}
+    # row_count key -> (label, maximum rows)
+    row_counts: Dict[str, Tuple[str, int]] = {}
+    required: List[Tuple[str, str]] = []
+
+    for field in fields:
+        field_id = field.get('id')
+        if not field_id:
+            continue
+        field_type = field.get('type', 'text')
+        label = field.get('label') or field_id
+
+        if field_type == 'dynamic_table':
+            count_key = f"{field_id}_row_count"
+            row_total = len(field.get('rows') or [])
+            row_counts[count_key] = (label, row_total)
+            if field.get('required'):
+                required.append((count_key, label))
+            for col_index, column in enumerate(field.get('columns') or []):
+                if column.get('access') == 'client':
+                    check = _optional(CELL_CHECKS.get(column.get('type'), _check_text))
+                else:
+                    check = _optional(_check_admin_cell)
+                cell_label = f"{label} / {column.get('label') or f'column {col_index + 1}'}"
+                for row_index in range(row_total):
+                    cell_checks[f"{field_id}_row_{row_index}_col_{col_index}"] = (
+                        f"{cell_label} (row {row_index + 1})", count_key, row_index, check
+                    )
+            continue
+
+        if field_type == 'dropdown':
+            check = _dropdown_check(field.get('options') or [])
+        else:
+            check = FIELD_CHECKS.get(field_type, _check_text)
+
+        if field.get('required'):
+            required.append((field_id, label))
+            # A required checkbox has to be ticked, as in the HTML form
+            if field_type == 'checkbox':
+                check = lambda value: None if value is True else "must be checked"
+            else:
+                base = check
+                check = lambda value, base=base: "is required" if _is_blank(value) else base(value)
+        elif field_type != 'checkbox':
+            check = _optional(check)
+        scalar_checks[field_id] = (label, check)
+
+    def validate(data: dict) -> List[str]:
+        errors: List[str] = []
+        for key, value in data.items():
+            scalar = scalar_checks.get(key)
+            if scalar is not None:
+                error = scalar[1](value)
+                if error:
+                    errors.append(f"{scalar[0]} {error}")
+            else:
+                cell = cell_checks.get(key)
+                if cell is not None:
+                    error = cell[3](value)
+                    if error:
+                        errors.append(f"{cell[0]} {error}")
+                    else:
+                        submitted_rows = data.get(cell[1])
+                        if (isinstance(submitted_rows, int) and not isinstance(submitted_rows, bool)
+                                and cell[2] >= submitted_rows):
+                            errors.append(f"{cell[0]} is beyond the submitted row count")
+                elif key in row_counts:
+                    label, row_total = row_counts[key]
+                    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= row_total:
+                        errors.append(f"{label} row count must be between 0 and {row_total}")
+                else:
+                    errors.append(f"Unknown field '{key}'")
+            if len(errors) >= MAX_ERRORS:
+                return errors
+
+        for key, label in required:
+            if key not in data:
+                errors.append(f"{label} is required")
+        return errors[:MAX_ERRORS]
+
+    return validate
+
+
+def cached_validator(form_id: str) -> Optional[Tuple[Any, Validator]]:
+    """The most recently compiled (updated_at, validator) for a form, if any"""
+    return validator_cache.get(form_id)
+
+
+def store_validator(form_id: str, updated_at: Any, fields: List[dict]) -> Validator:
+    """
+    Compile and cache the validator for one version of a form
+
+    Args:
+        form_id: Form id
+        updated_at: The form's updated_at, identifying this version
+        fields: The form's `data.fields`
+
+    Returns:
+        The compiled validator
+    """
+    validator = compile_validator(fields)
+    validator_cache.put(form_id, (updated_at, validator))
+    return validator
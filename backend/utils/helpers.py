@@ -5,14 +5,67 @@ import json
 import logging
 from typing import Any, Dict, Optional
 from datetime import datetime
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def json_dumps(data: Any) -> str:
+    """
+    Encode data as a JSON string, using orjson when it is installed
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, default=str)
+
+
+def json_loads(text: Any) -> Any:
+    """
+    Decode a JSON string, using orjson when it is installed
+    
+    Args:
+        text: JSON text (str or bytes)
+        
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def raw_json_response(body: str, status_code: int = 200) -> Response:
+    """
+    Send JSON text produced by Postgres as the response body as-is
+    
+    Args:
+        body: JSON document text, e.g. from a json_build_object/json_agg query
+        status_code: HTTP status code
+        
+    Returns:
+        Response with an application/json content type
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
 def parse_jsonb_field(data: Any) -> Dict:
     """
     Parse JSONB field from database
     
+    The pool registers a JSONB codec, so records normally already hold
+    decoded values; strings are only seen from connections without it.
+    
     Args:
         data: JSONB data which could be string or dict
         
@@ -24,8 +77,8 @@ def parse_jsonb_field(data: Any) -> Dict:
     
     if isinstance(data, str):
         try:
-            return json.loads(data)
-        except json.JSONDecodeError as e:
+            return json_loads(data)
+        except ValueError as e:
             logger.error(f"Failed to parse JSONB data: {e}")
             return {}
     
@@ -47,7 +100,7 @@ def serialize_jsonb_field(data: Any) -> str:
         JSON string
     """
     try:
-        return json.dumps(data)
+        return json_dumps(data)
     except (TypeError, ValueError) as e:
         logger.error(f"Failed to serialize data to JSON: {e}")
         raise ValueError(f"Cannot serialize data to JSON: {str(e)}")
@@ -0,0 +1,176 @@
+"""
+RFC 6902 JSON Patch
+
+Applies add, remove, replace, move, copy and test operations to a decoded
+JSON document. Unless asked to work in place, the document is deep-copied
+first so a patch that fails part way leaves the caller's value untouched.
+Paths are RFC 6901 JSON Pointers.
+"""
+import copy
+import re
+from typing import Any, List, Tuple
+
+# RFC 6901 array index: ASCII digits only (str.isdigit also accepts e.g. '²')
+_ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied"""
+    pass
+
+
+def _parse_pointer(pointer: Any) -> List[str]:
+    """Split a JSON Pointer into unescaped reference tokens"""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container: list, token: str, allow_end: bool = False) -> int:
+    """Resolve an array reference token, optionally allowing '-' or len()"""
+    if allow_end and token == "-":
+        return len(container)
+    if not _ARRAY_INDEX.fullmatch(token):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    """Return the value the tokens point at"""
+    value = document
+    for token in tokens:
+        if isinstance(value, dict):
+            if token not in value:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            value = value[token]
+        elif isinstance(value, list):
+            value = value[_array_index(value, token)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return value
+
+
+def _parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    """Return the container holding the last token, and that token"""
+    if not tokens:
+        raise JsonPatchError("Operation cannot target the whole document")
+    parent = _resolve(document, tokens[:-1])
+    if not isinstance(parent, (dict, list)):
+        raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return parent, tokens[-1]
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        parent[token] = value
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, list):
+        removed = parent.pop(_array_index(parent, token))
+    else:
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        removed = parent.pop(token)
+    return removed
+
+
+def _replace(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, list):
+        parent[_array_index(parent, token)] = value
+    else:
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        parent[token] = value
+    return document
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    """
+    Compare two decoded JSON values as RFC 6902 `test` does
+
+    Unlike Python's ==, values of different JSON types never match, so
+    true is not 1 and 1 is not "1"; numbers compare by value (1 == 1.0).
+    """
+    if isinstance(left, bool) or isinstance(right, bool):
+        return isinstance(left, bool) and isinstance(right, bool) and left == right
+    if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+        return isinstance(left, (int, float)) and isinstance(right, (int, float)) and left == right
+    if isinstance(left, dict) or isinstance(right, dict):
+        return (isinstance(left, dict) and isinstance(right, dict) and left.keys() == right.keys()
+                and all(_json_equal(value, right[key]) for key, value in left.items()))
+    if isinstance(left, list) or isinstance(right, list):
+        return (isinstance(left, list) and isinstance(right, list) and len(left) == len(right)
+                and all(_json_equal(a, b) for a, b in zip(left, right)))
+    return type(left) is type(right) and left == right
+
+
+def _value(operation: dict) -> Any:
+    if "value" not in operation:
+        raise JsonPatchError(f"'{operation.get('op')}' operation requires a value")
+    return operation["value"]
+
+
+def apply_patch(document: Any, operations: List[dict], in_place: bool = False) -> Any:
+    """
+    Apply a JSON Patch to a document
+
+    Args:
+        document: Decoded JSON document
+        operations: List of RFC 6902 operation objects
+        in_place: Modify `document` itself instead of a copy; use for
+            documents the caller discards if the patch fails
+
+    Returns:
+        The patched document
+
+    Raises:
+        JsonPatchError: If an operation is malformed, targets a missing
+            path, or a `test` operation fails
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise JsonPatchError("Each operation must be an object")
+        op = operation.get("op")
+        tokens = _parse_pointer(operation.get("path"))
+
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(_value(operation)))
+        elif op == "remove":
+            _remove(document, tokens)
+        elif op == "replace":
+            document = _replace(document, tokens, copy.deepcopy(_value(operation)))
+        elif op in ("move", "copy"):
+            source = _parse_pointer(operation.get("from"))
+            if op == "move":
+                if tokens == source:
+                    _resolve(document, source)
+                elif tokens[:len(source)] == source:
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                else:
+                    document = _add(document, tokens, _remove(document, source))
+            else:
+                document = _add(document, tokens, copy.deepcopy(_resolve(document, source)))
+        elif op == "test":
+            if not _json_equal(_resolve(document, tokens), _value(operation)):
+                raise JsonPatchError(f"Test failed at {operation.get('path')}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return document
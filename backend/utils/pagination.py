@@ -0,0 +1,105 @@
+"""
+Keyset pagination for list endpoints
+
+Lists are ordered newest first on (timestamp, id) and paged with an opaque
+cursor holding the last row's key, so every page is an index range scan no
+matter how deep it is. Response bodies stay plain JSON arrays; the cursor
+for the next page, when there is one, is sent in the `X-Next-Cursor` header.
+"""
+import base64
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Literal, Optional, Tuple
+from fastapi import HTTPException, Query, Response
+import config as config_module
+from utils.helpers import raw_json_response
+
+settings = config_module.settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# `view` query parameter of list endpoints: "summary" leaves out JSONB payloads
+ListView = Literal["full", "summary"]
+
+# Keys that sort after every real row, used for the first page so each list
+# keeps a single prepared statement
+FIRST_PAGE_TIMESTAMP = datetime.max
+FIRST_PAGE_UUID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+FIRST_PAGE_INT = 2**31 - 1
+
+
+def uuid_id(value: str) -> str:
+    """Cursor id parser for UUID keys; raises ValueError if malformed"""
+    return str(uuid.UUID(value))
+
+
+def int_id(value: str) -> int:
+    """Cursor id parser for INTEGER (serial) keys; raises ValueError if out of range"""
+    number = int(value)
+    if not 0 <= number <= FIRST_PAGE_INT:
+        raise ValueError(f"Cursor id out of range: {number}")
+    return number
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """Encode a row's sort key as an opaque cursor"""
+    raw = f"{sort_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, id_type: Callable[[str], Any] = uuid_id) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    The id part is checked with `id_type`, so a tampered cursor is rejected
+    here rather than failing as a query parameter.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_value, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(sort_value), id_type(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class PageParams:
+    """Route dependency reading `limit` and `cursor` query parameters"""
+
+    def __init__(
+        self,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+    def after(self, id_type: Callable[[str], Any] = uuid_id, first_id: Any = FIRST_PAGE_UUID) -> Tuple[datetime, Any]:
+        """Keyset to continue after: the cursor's key, or a sentinel for the first page"""
+        if self.cursor is None:
+            return FIRST_PAGE_TIMESTAMP, first_id
+        return decode_cursor(self.cursor, id_type)
+
+
+def set_next_cursor(response: Response, page: PageParams, count: int, last_sort: Optional[datetime], last_id: Any):
+    """Advertise the next page when this one came back full"""
+    if count >= page.limit and last_sort is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_sort, last_id)
+
+
+def json_page_response(row, page: PageParams) -> Response:
+    """
+    Build the response for a page produced by a queries.json_page statement
+
+    Args:
+        row: Record with body, count, last_sort and last_id columns
+        page: Paging parameters of the request
+
+    Returns:
+        Raw JSON array response, with X-Next-Cursor when more rows may follow
+    """
+    response = raw_json_response(row['body'])
+    set_next_cursor(response, page, row['count'], row['last_sort'], row['last_id'])
+    return response
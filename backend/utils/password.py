@@ -1,9 +1,85 @@
+"""
+Password hashing
+
+Passwords are hashed with bcrypt. bcrypt is deliberately slow, so the async
+helpers run it on a small dedicated thread pool (bcrypt releases the GIL)
+instead of on the event loop; PASSWORD_HASH_CONCURRENCY caps how many hashes
+run at once so a burst of logins cannot starve other requests of CPU.
+
+Hashes from the old unsalted SHA-256 scheme still verify, and
+`needs_rehash` reports them so login can upgrade them to bcrypt.
+"""
+import asyncio
 import hashlib
+import hmac
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import config as config_module
+from metrics import registry
+
+settings = config_module.settings
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_BYTES = 72
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+PASSWORD_HASH_SECONDS = registry.histogram(
+    "password_hash_seconds", "Time spent hashing or verifying passwords, including queueing", ["operation"]
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="password-hash",
+)
+
+def _secret(password: str) -> bytes:
+    """Encode a password the way bcrypt sees it"""
+    return password.encode()[:BCRYPT_MAX_BYTES]
+
+def is_legacy_hash(hashed_password: str) -> bool:
+    """Check whether a stored hash uses the old unsalted SHA-256 scheme"""
+    return bool(_LEGACY_SHA256.match(hashed_password))
 
 def hash_password(password: str) -> str:
-    """Hash a password using SHA256 - no length restrictions"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password using bcrypt (blocking; prefer hash_password_async)"""
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return hash_password(plain_password) == hashed_password
+    """Verify a password against a bcrypt or legacy SHA-256 hash (blocking)"""
+    if is_legacy_hash(hashed_password):
+        legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed_password)
+    try:
+        return bcrypt.checkpw(_secret(plain_password), hashed_password.encode())
+    except ValueError:
+        # Not a hash we recognise
+        return False
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash should be replaced with a current bcrypt hash"""
+    if is_legacy_hash(hashed_password):
+        return True
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds < settings.BCRYPT_ROUNDS
+
+async def _run(operation: str, func, *args):
+    """Run a blocking hash function on the hashing pool"""
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, operation)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run("hash", hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await _run("verify", verify_password, plain_password, hashed_password)
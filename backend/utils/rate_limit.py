@@ -0,0 +1,181 @@
+"""
+In-process login throttling
+
+Token buckets limit how fast each client IP and each email may attempt to
+log in, and a sliding window of recent failures locks an email out after
+repeated bad passwords. All state lives in bounded OrderedDicts that evict
+the least recently used key, so memory stays flat under a spray of distinct
+emails or addresses. Limits are per worker process.
+
+Everything runs on the event loop, so no locking is needed.
+"""
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+from fastapi import Request
+import config as config_module
+from metrics import registry
+
+settings = config_module.settings
+
+LOGIN_THROTTLED = registry.counter(
+    "login_throttled_total", "Login attempts rejected before authentication", ["reason"]
+)
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key
+
+    Each key holds up to `burst` tokens and regains `rate` tokens per second.
+    A bucket is stored as a two-item list [tokens, last_refill].
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Take one token for a key
+
+        Returns:
+            0 if the attempt is allowed, otherwise seconds until a token frees up
+        """
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+class FailureLockout:
+    """
+    Sliding-window lockout per key
+
+    `max_failures` failures within `window` seconds lock the key for
+    `lockout` seconds. Only the last `max_failures` timestamps are kept.
+    """
+
+    def __init__(self, max_failures: int, window: float, lockout: float, max_keys: int):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self.max_keys = max_keys
+        self._failures: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._locked_until: "OrderedDict[str, float]" = OrderedDict()
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """Seconds until the key is unlocked, or 0 if it is not locked"""
+        locked_until = self._locked_until.get(key)
+        if locked_until is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        if now >= locked_until:
+            del self._locked_until[key]
+            return 0.0
+        return locked_until - now
+
+    def record_failure(self, key: str, now: Optional[float] = None):
+        """Record a failed attempt, locking the key if the window fills up"""
+        now = time.monotonic() if now is None else now
+        failures = self._failures.get(key)
+        if failures is None:
+            failures = deque(maxlen=self.max_failures)
+            self._failures[key] = failures
+            if len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+        else:
+            self._failures.move_to_end(key)
+        failures.append(now)
+
+        if len(failures) == self.max_failures and now - failures[0] <= self.window:
+            self._locked_until[key] = now + self.lockout
+            self._locked_until.move_to_end(key)
+            if len(self._locked_until) > self.max_keys:
+                self._locked_until.popitem(last=False)
+            failures.clear()
+
+    def reset(self, key: str):
+        """Forget failures for a key after a successful attempt"""
+        self._failures.pop(key, None)
+
+
+class LoginThrottle:
+    """Per-IP and per-email buckets plus per-email lockout for the login route"""
+
+    def __init__(self):
+        max_keys = settings.LOGIN_THROTTLE_MAX_KEYS
+        self.by_ip = TokenBucketLimiter(settings.LOGIN_IP_RATE_PER_MINUTE / 60,
+                                        settings.LOGIN_IP_BURST, max_keys)
+        self.by_email = TokenBucketLimiter(settings.LOGIN_EMAIL_RATE_PER_MINUTE / 60,
+                                           settings.LOGIN_EMAIL_BURST, max_keys)
+        self.lockout = FailureLockout(settings.LOGIN_LOCKOUT_FAILURES, settings.LOGIN_LOCKOUT_WINDOW_SECONDS,
+                                      settings.LOGIN_LOCKOUT_SECONDS, max_keys)
+
+    def check(self, email: str, ip: str) -> float:
+        """
+        Decide whether a login attempt may proceed
+
+        Args:
+            email: Email being logged in to
+            ip: Client address
+
+        Returns:
+            0 if allowed, otherwise seconds the caller should wait
+        """
+        email = email.lower()
+        retry_after = self.lockout.retry_after(email)
+        if retry_after:
+            LOGIN_THROTTLED.inc("lockout")
+            return retry_after
+        retry_after = self.by_ip.acquire(ip)
+        if retry_after:
+            LOGIN_THROTTLED.inc("ip")
+            return retry_after
+        retry_after = self.by_email.acquire(email)
+        if retry_after:
+            LOGIN_THROTTLED.inc("email")
+        return retry_after
+
+    def record_failure(self, email: str):
+        """Count a failed login towards the email's lockout"""
+        self.lockout.record_failure(email.lower())
+
+    def record_success(self, email: str):
+        """Clear the email's failure history"""
+        self.lockout.reset(email.lower())
+
+
+def client_address(request: Request) -> str:
+    """
+    Address of the client behind TRUSTED_PROXY_HOPS proxies
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so only the rightmost TRUSTED_PROXY_HOPS entries can be
+    trusted; anything further left was sent by the client.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [entry for entry in forwarded if entry]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+# Global login throttle
+login_throttle = LoginThrottle()
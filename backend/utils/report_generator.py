@@ -1,88 +1,110 @@
-from typing import Dict, List
-import json
+from typing import List, Optional, Tuple
+import math
 from datetime import datetime
+import numpy as np
+
+# (label, unit, target, actual) of a numeric field with a target
+MetricInput = Tuple[str, str, float, float]
+
+def round_2(value: float) -> float:
+    """
+    Round to 2 decimals the way np.round(value, 2) does
+    
+    Scales by 100, rounds half to even and scales back, so the scalar and
+    numpy paths of the report generator agree to the last bit. Negative
+    zero is normalised to 0.0.
+    """
+    if not math.isfinite(value):
+        return value
+    return round(value * 100) / 100 + 0.0
 
 def calculate_achievement(actual: float, target: float) -> float:
     """Calculate achievement percentage"""
     if target == 0:
         return 100.0 if actual == 0 else 0.0
-    return round((actual / target) * 100, 2)
+    return round_2((actual / target) * 100)
 
 def calculate_variance(actual: float, target: float) -> float:
     """Calculate variance between actual and target"""
-    return round(actual - target, 2)
+    return round_2(actual - target)
 
-def generate_report(form_data: dict, submission_data: dict, period: str = "weekly") -> dict:
+def extract_metric_inputs(form_data: dict, submission_data: dict) -> List[MetricInput]:
     """
-    Generate a report comparing form targets with submission actuals
+    Collect the numeric fields that have both a target and a usable actual value
     
     Args:
         form_data: The form structure with target values
         submission_data: The submitted data with actual values
-        period: Report period ('weekly' or 'monthly')
     
     Returns:
-        Dictionary containing the generated report
+        (label, unit, target, actual) for each reportable field, in form order
     """
+    inputs = []
     
-    metrics = []
-    total_achievement = 0
-    fields_count = 0
-    
-    # Extract fields from form data
-    form_fields = form_data.get('fields', [])
-    
-    for field in form_fields:
+    for field in form_data.get('fields', []):
         field_id = field.get('id')
-        field_label = field.get('label', field_id)
         field_type = field.get('type', 'text')
         target = field.get('target')
-        unit = field.get('unit', '')
-        
-        # Get actual value from submission
         actual = submission_data.get(field_id)
         
         # Only process numeric fields with targets
         if field_type in ['number', 'integer'] and target is not None and actual is not None:
             try:
-                target_val = float(target)
-                actual_val = float(actual)
-                
-                achievement = calculate_achievement(actual_val, target_val)
-                variance = calculate_variance(actual_val, target_val)
-                
-                # Determine status
-                if achievement >= 100:
-                    status = "Excellent"
-                    status_color = "green"
-                elif achievement >= 80:
-                    status = "Good"
-                    status_color = "blue"
-                elif achievement >= 60:
-                    status = "Fair"
-                    status_color = "yellow"
-                else:
-                    status = "Needs Improvement"
-                    status_color = "red"
-                
-                metrics.append({
-                    "field": field_label,
-                    "target": target_val,
-                    "actual": actual_val,
-                    "unit": unit,
-                    "achievement": achievement,
-                    "variance": variance,
-                    "status": status,
-                    "status_color": status_color
-                })
-                
-                total_achievement += achievement
-                fields_count += 1
-                
+                inputs.append((field.get('label', field_id), field.get('unit', ''), float(target), float(actual)))
             except (ValueError, TypeError):
                 # Skip fields with invalid numeric values
                 continue
     
+    return inputs
+
+def build_report(inputs: List[MetricInput], achievements: List[float], variances: List[float],
+                 period: str, generated_at: Optional[str] = None) -> dict:
+    """
+    Assemble a report from its metric inputs and computed results
+    
+    Args:
+        inputs: Output of extract_metric_inputs
+        achievements: Achievement percentage per input
+        variances: Variance per input
+        period: Report period ('weekly' or 'monthly')
+        generated_at: ISO timestamp; defaults to now
+    
+    Returns:
+        Dictionary containing the generated report
+    """
+    metrics = []
+    total_achievement = 0
+    
+    for (field_label, unit, target_val, actual_val), achievement, variance in zip(inputs, achievements, variances):
+        # Determine status
+        if achievement >= 100:
+            status = "Excellent"
+            status_color = "green"
+        elif achievement >= 80:
+            status = "Good"
+            status_color = "blue"
+        elif achievement >= 60:
+            status = "Fair"
+            status_color = "yellow"
+        else:
+            status = "Needs Improvement"
+            status_color = "red"
+        
+        metrics.append({
+            "field": field_label,
+            "target": target_val,
+            "actual": actual_val,
+            "unit": unit,
+            "achievement": achievement,
+            "variance": variance,
+            "status": status,
+            "status_color": status_color
+        })
+        
+        total_achievement += achievement
+    
+    fields_count = len(metrics)
+    
     # Calculate overall score
     overall_score = round(total_achievement / fields_count, 2) if fields_count > 0 else 0
     
@@ -104,7 +126,7 @@ def generate_report(form_data: dict, submission_data: dict, period: str = "weekl
     
     return {
         "period": period,
-        "generated_at": datetime.utcnow().isoformat(),
+        "generated_at": generated_at or datetime.utcnow().isoformat(),
         "overall_score": overall_score,
         "summary": summary,
         "metrics": metrics,
@@ -116,3 +138,58 @@ def generate_report(form_data: dict, submission_data: dict, period: str = "weekl
             "needs_improvement": needs_improvement_count
         }
     }
+
+def generate_report(form_data: dict, submission_data: dict, period: str = "weekly") -> dict:
+    """
+    Generate a report comparing form targets with submission actuals
+    
+    Args:
+        form_data: The form structure with target values
+        submission_data: The submitted data with actual values
+        period: Report period ('weekly' or 'monthly')
+    
+    Returns:
+        Dictionary containing the generated report
+    """
+    inputs = extract_metric_inputs(form_data, submission_data)
+    achievements = [calculate_achievement(actual, target) for _, _, target, actual in inputs]
+    variances = [calculate_variance(actual, target) for _, _, target, actual in inputs]
+    return build_report(inputs, achievements, variances, period)
+
+def generate_reports(items: List[Tuple[dict, dict]], period: str = "weekly") -> List[dict]:
+    """
+    Generate reports for many (form_data, submission_data) pairs at once
+    
+    The achievement and variance arithmetic, rounding included, runs once
+    over the flattened target and actual arrays of the whole batch with
+    numpy. The scalar functions round like np.round, so the reports match
+    generate_report exactly.
+    
+    Args:
+        items: (form_data, submission_data) per report
+        period: Report period ('weekly' or 'monthly')
+    
+    Returns:
+        One report per item, in order
+    """
+    batch_inputs = [extract_metric_inputs(form_data, submission_data) for form_data, submission_data in items]
+    flat = [metric for inputs in batch_inputs for metric in inputs]
+    
+    achievements: List[float] = []
+    variances: List[float] = []
+    if flat:
+        targets = np.fromiter((metric[2] for metric in flat), dtype=np.float64, count=len(flat))
+        actuals = np.fromiter((metric[3] for metric in flat), dtype=np.float64, count=len(flat))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(targets == 0, np.where(actuals == 0, 100.0, 0.0), (actuals / targets) * 100)
+            achievements = (np.round(ratios, 2) + 0.0).tolist()
+        variances = (np.round(actuals - targets, 2) + 0.0).tolist()
+    
+    generated_at = datetime.utcnow().isoformat()
+    reports = []
+    offset = 0
+    for inputs in batch_inputs:
+        end = offset + len(inputs)
+        reports.append(build_report(inputs, achievements[offset:end], variances[offset:end], period, generated_at))
+        offset = end
+    return reports
@@ -3,6 +3,8 @@
 
 let currentFormData = null;
 let currentFormId = null;
+// Form as last saved, to send only the changes as a JSON Patch
+let savedFormContent = null;
 
 const FIELD_TYPES = {
   text: { label: 'Text', icon: '📝', hasTarget: false },
@@ -17,6 +19,7 @@ const FIELD_TYPES = {
 function showFormBuilder(form = null) {
   currentFormData = form ? JSON.parse(JSON.stringify(form)) : { data: { fields: [] } };
   currentFormId = form ? form.id : null;
+  savedFormContent = form ? JSON.parse(JSON.stringify({ title: form.title, data: form.data })) : null;
 
   // Create overlay wrapper
   const overlay = document.createElement('div');
@@ -317,6 +320,43 @@ function collectFieldsData() {
   });
 }
 
+// --- JSON Patch (RFC 6902) ---
+
+function escapePointerToken(token) {
+  return String(token).replace(/~/g, '~0').replace(/\//g, '~1');
+}
+
+// Build the operations that turn `before` into `after`
+function diffJson(before, after, path = '', ops = []) {
+  if (before === after) return ops;
+
+  const bothArrays = Array.isArray(before) && Array.isArray(after);
+  const bothObjects = before && after && typeof before === 'object' && typeof after === 'object'
+    && !Array.isArray(before) && !Array.isArray(after);
+
+  if (bothArrays) {
+    const common = Math.min(before.length, after.length);
+    for (let i = 0; i < common; i++) diffJson(before[i], after[i], `${path}/${i}`, ops);
+    for (let i = before.length - 1; i >= common; i--) ops.push({ op: 'remove', path: `${path}/${i}` });
+    for (let i = common; i < after.length; i++) ops.push({ op: 'add', path: `${path}/-`, value: after[i] });
+  } else if (bothObjects) {
+    Object.keys(before).forEach((key) => {
+      if (!(key in after) || after[key] === undefined) {
+        if (before[key] !== undefined) ops.push({ op: 'remove', path: `${path}/${escapePointerToken(key)}` });
+      }
+    });
+    Object.keys(after).forEach((key) => {
+      if (after[key] === undefined) return;
+      const childPath = `${path}/${escapePointerToken(key)}`;
+      if (!(key in before) || before[key] === undefined) ops.push({ op: 'add', path: childPath, value: after[key] });
+      else diffJson(before[key], after[key], childPath, ops);
+    });
+  } else {
+    ops.push({ op: 'replace', path, value: after });
+  }
+  return ops;
+}
+
 async function saveForm() {
   const title = document.getElementById('form-title').value;
   if (!title) {
@@ -341,11 +381,17 @@ async function saveForm() {
 
   try {
     if (currentFormId) {
-      // Update existing form
-      await api.put(`/api/forms/${currentFormId}`, {
-        title,
-        data: { fields },
-      });
+      // Update existing form, sending only what changed
+      const content = JSON.parse(JSON.stringify({ title, data: { ...savedFormContent.data, fields } }));
+      const operations = diffJson(savedFormContent, content);
+      if (operations.length > 0) {
+        const result = await api.patch(`/api/forms/${currentFormId}`, {
+          updated_at: currentFormData.updated_at,
+          operations,
+        });
+        currentFormData.updated_at = result.updated_at;
+        savedFormContent = content;
+      }
       ui.showToast('Form updated successfully!', 'success');
     } else {
       // Create new form
@@ -368,7 +414,17 @@ async function saveForm() {
   }
 }
 
-function editForm(form) {
+async function editForm(form) {
+  // Form lists may only carry summaries; load the full definition to edit
+  if (!form.data) {
+    try {
+      form = await api.get(`/api/forms/${form.id}`);
+    } catch (error) {
+      console.error(error);
+      ui.showToast(error.message || 'Failed to load form', 'error');
+      return;
+    }
+  }
   showFormBuilder(form);
 }
 
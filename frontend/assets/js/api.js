@@ -48,6 +48,9 @@ const api = {
 
     try {
       const response = await fetch(fullUrl, config);
+      if (options.onResponse) {
+        options.onResponse(response);
+      }
 
       // Handle unauthorized
       if (response.status === 401) {
@@ -93,6 +96,23 @@ const api = {
     return this.request(endpoint, { method: 'GET' });
   },
 
+  /**
+   * GET one page of a cursor-paginated list endpoint
+   * Returns { items, nextCursor }; nextCursor is null on the last page
+   */
+  async getPage(endpoint, cursor = null) {
+    let nextCursor = null;
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const url = cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint;
+    const items = await this.request(url, {
+      method: 'GET',
+      onResponse: (response) => {
+        nextCursor = response.headers.get('X-Next-Cursor');
+      },
+    });
+    return { items, nextCursor };
+  },
+
   /**
    * POST request
    */
@@ -113,6 +133,16 @@ const api = {
     });
   },
 
+  /**
+   * PATCH request
+   */
+  async patch(endpoint, data) {
+    return this.request(endpoint, {
+      method: 'PATCH',
+      body: JSON.stringify(data),
+    });
+  },
+
   /**
    * DELETE request
    */
@@ -138,6 +168,20 @@ const api = {
     return response;
   },
 
+  /**
+   * Revoke the current token on the server (best effort)
+   */
+  revokeSession() {
+    const token = this.getToken();
+    if (!token) return;
+    // keepalive lets the request finish while the page navigates away
+    fetch(`${API_BASE_URL}/api/auth/logout`, {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${token}` },
+      keepalive: true,
+    }).catch(() => {});
+  },
+
   /**
    * Logout
    */
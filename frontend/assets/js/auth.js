@@ -90,6 +90,7 @@ function redirectByRole() {
  * Logout and redirect to login
  */
 function logout() {
+    api.revokeSession();
     api.logout();
     window.location.href = '/login.html';
 }
@@ -0,0 +1,55 @@
+-- Move form definitions out of forms.data into form_schemas
+--
+-- For databases created from schema.sql before form definitions were
+-- deduplicated. Runs in one transaction: every form's definition is stored
+-- under its hash, forms are pointed at it, and only then is forms.data
+-- dropped. Stop the API while it runs; the definitions are hashed exactly
+-- as store_form_schema() does, so later writes of the same definition reuse
+-- these rows.
+BEGIN;
+
+-- Form Schemas Table (as in schema.sql)
+CREATE TABLE IF NOT EXISTS form_schemas (
+    hash CHAR(64) PRIMARY KEY,
+    data JSONB NOT NULL,
+    field_count INTEGER GENERATED ALWAYS AS (jsonb_array_length(COALESCE(data->'fields', '[]'::jsonb))) STORED,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION store_form_schema(schema_data JSONB) RETURNS CHAR(64) AS $$
+DECLARE
+    schema_hash CHAR(64) := encode(sha256(convert_to(schema_data::text, 'UTF8')), 'hex');
+BEGIN
+    INSERT INTO form_schemas (hash, data) VALUES (schema_hash, schema_data)
+    ON CONFLICT (hash) DO UPDATE SET hash = EXCLUDED.hash WHERE false;
+    RETURN schema_hash;
+END;
+$$ LANGUAGE plpgsql STRICT;
+
+-- Backfill: one form_schemas row per distinct definition
+ALTER TABLE forms ADD COLUMN IF NOT EXISTS schema_hash CHAR(64) REFERENCES form_schemas(hash);
+
+INSERT INTO form_schemas (hash, data)
+SELECT DISTINCT ON (hash) hash, data
+FROM (
+    SELECT encode(sha256(convert_to(data::text, 'UTF8')), 'hex') AS hash, data
+    FROM forms
+) definitions
+ON CONFLICT (hash) DO NOTHING;
+
+UPDATE forms
+SET schema_hash = encode(sha256(convert_to(data::text, 'UTF8')), 'hex')
+WHERE schema_hash IS NULL;
+
+ALTER TABLE forms ALTER COLUMN schema_hash SET NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_forms_schema_hash ON forms(schema_hash);
+
+-- Forms with their definitions, in the shape the API returns
+CREATE OR REPLACE VIEW form_documents AS
+SELECT f.id, f.client_id, f.title, s.data, f.status, f.is_template, f.created_at, f.updated_at, f.schema_hash
+FROM forms f
+JOIN form_schemas s ON s.hash = f.schema_hash;
+
+ALTER TABLE forms DROP COLUMN data;
+
+COMMIT;
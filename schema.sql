@@ -1,7 +1,10 @@
 -- Drop existing tables if they exist (clean database)
+DROP TABLE IF EXISTS report_jobs CASCADE;
+DROP TABLE IF EXISTS token_revocations CASCADE;
 DROP TABLE IF EXISTS reports CASCADE;
 DROP TABLE IF EXISTS submissions CASCADE;
 DROP TABLE IF EXISTS forms CASCADE;
+DROP TABLE IF EXISTS form_schemas CASCADE;
 DROP TABLE IF EXISTS clients CASCADE;
 DROP TABLE IF EXISTS admins CASCADE;
 
@@ -28,12 +31,24 @@ CREATE TABLE clients (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Form Schemas Table
+-- Form definitions stored once, keyed by the SHA-256 of their canonical
+-- JSONB text. Forms that share a definition (template copies) point at the
+-- same row; editing one form stores a new definition and repoints only it.
+-- Databases that still have forms.data: run migrations/001_form_schemas.sql.
+CREATE TABLE form_schemas (
+    hash CHAR(64) PRIMARY KEY,
+    data JSONB NOT NULL,
+    field_count INTEGER GENERATED ALWAYS AS (jsonb_array_length(COALESCE(data->'fields', '[]'::jsonb))) STORED,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Forms Table
 CREATE TABLE forms (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     client_id INTEGER REFERENCES clients(id) ON DELETE CASCADE,
     title VARCHAR(255) NOT NULL,
-    data JSONB NOT NULL,
+    schema_hash CHAR(64) NOT NULL REFERENCES form_schemas(hash),
     status VARCHAR(20) DEFAULT 'draft' CHECK (status IN ('draft', 'published')),
     is_template BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -46,7 +61,9 @@ CREATE TABLE submissions (
     client_id INTEGER REFERENCES clients(id) ON DELETE CASCADE,
     form_id UUID REFERENCES forms(id) ON DELETE CASCADE,
     data JSONB NOT NULL,
-    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- One submission per client per form; resubmitting updates it in place
+    CONSTRAINT uq_submissions_client_form UNIQUE (client_id, form_id)
 );
 
 -- Reports Table
@@ -59,22 +76,103 @@ CREATE TABLE reports (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Report Jobs Table
+-- Batch report generation runs, with progress. At most one job runs at a
+-- time (idx_report_jobs_one_running); updated_at is bumped after every
+-- chunk, so a job whose worker died can be recognised and failed.
+CREATE TABLE report_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    period VARCHAR(20) NOT NULL CHECK (period IN ('weekly', 'monthly')),
+    submitted_from DATE NOT NULL,
+    submitted_to DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'failed')),
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Token Revocations Table
+-- Append-only log every worker re-reads from shortly before the newest
+-- revoked_at it has seen (ids are not assigned in commit order). A row
+-- revokes either one token (jti) or every token a subject was issued (whole-
+-- second iat) before issued_before ("revoke all sessions"). Rows are only
+-- needed until expires_at, after which the tokens they cover have expired
+-- anyway.
+CREATE TABLE token_revocations (
+    id BIGSERIAL PRIMARY KEY,
+    jti VARCHAR(64),
+    subject VARCHAR(100),
+    issued_before TIMESTAMPTZ,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    CHECK (jti IS NOT NULL OR (subject IS NOT NULL AND issued_before IS NOT NULL))
+);
+
 -- Create indexes for better performance
-CREATE INDEX idx_forms_client_id ON forms(client_id);
+-- Keyset pagination indexes: (filter, sort key DESC, id DESC) serve both the
+-- list pages and plain lookups on their leading column
+CREATE INDEX idx_forms_client_created ON forms(client_id, created_at DESC, id DESC);
 CREATE INDEX idx_forms_status ON forms(status);
-CREATE INDEX idx_forms_client_status ON forms(client_id, status);
-CREATE INDEX idx_forms_is_template ON forms(is_template) WHERE is_template = true;
+CREATE INDEX idx_forms_published_client_created ON forms(client_id, created_at DESC, id DESC) WHERE status = 'published';
+CREATE INDEX idx_forms_templates_created ON forms(created_at DESC, id DESC) WHERE is_template = true;
+CREATE INDEX idx_forms_schema_hash ON forms(schema_hash);
 
-CREATE INDEX idx_submissions_client_id ON submissions(client_id);
+CREATE INDEX idx_submissions_client_submitted ON submissions(client_id, submitted_at DESC, id DESC);
 CREATE INDEX idx_submissions_form_id ON submissions(form_id);
-CREATE INDEX idx_submissions_client_form ON submissions(client_id, form_id);
 CREATE INDEX idx_submissions_submitted_at ON submissions(submitted_at DESC);
 
-CREATE INDEX idx_reports_client_id ON reports(client_id);
+CREATE INDEX idx_reports_client_created ON reports(client_id, created_at DESC, id DESC);
 CREATE INDEX idx_reports_submission_id ON reports(submission_id);
 CREATE INDEX idx_reports_created_at ON reports(created_at DESC);
 
 CREATE INDEX idx_clients_email ON clients(email);
+CREATE INDEX idx_clients_created ON clients(created_at DESC, id DESC);
+
+CREATE UNIQUE INDEX idx_report_jobs_one_running ON report_jobs (status) WHERE status = 'running';
+
+CREATE INDEX idx_token_revocations_expires_at ON token_revocations(expires_at);
+CREATE INDEX idx_token_revocations_revoked_at ON token_revocations(revoked_at);
+
+-- Store a form definition if it is new and return its hash. The existing row
+-- is locked on conflict (DO UPDATE ... WHERE false writes nothing), so
+-- garbage collection cannot delete it before the caller's form references it.
+CREATE OR REPLACE FUNCTION store_form_schema(schema_data JSONB) RETURNS CHAR(64) AS $$
+DECLARE
+    schema_hash CHAR(64) := encode(sha256(convert_to(schema_data::text, 'UTF8')), 'hex');
+BEGIN
+    INSERT INTO form_schemas (hash, data) VALUES (schema_hash, schema_data)
+    ON CONFLICT (hash) DO UPDATE SET hash = EXCLUDED.hash WHERE false;
+    RETURN schema_hash;
+END;
+$$ LANGUAGE plpgsql STRICT;
+
+-- Forms with their definitions, in the shape the API returns
+CREATE VIEW form_documents AS
+SELECT f.id, f.client_id, f.title, s.data, f.status, f.is_template, f.created_at, f.updated_at, f.schema_hash
+FROM forms f
+JOIN form_schemas s ON s.hash = f.schema_hash;
+
+-- Notify workers when a client's forms change so they can drop cached
+-- published-form pages. Fires for any writer, not only the API.
+CREATE OR REPLACE FUNCTION notify_forms_changed() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.client_id IS NOT NULL THEN
+        PERFORM pg_notify('forms_changed', OLD.client_id::text);
+    END IF;
+    -- Identical notifications in one transaction are delivered once
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.client_id IS NOT NULL THEN
+        PERFORM pg_notify('forms_changed', NEW.client_id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER forms_changed
+AFTER INSERT OR UPDATE OR DELETE ON forms
+FOR EACH ROW EXECUTE FUNCTION notify_forms_changed();
 
 -- Insert a default admin account (password: admin123)
 -- Password hash for 'admin123' using bcrypt